@@ -0,0 +1,202 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from corpus import write_corpus_arrays
+
+# Массовая генерация карт и BFS-оракул на NumPy.
+# Карты хранятся как (N, n, n) uint8 с ASCII-кодами клеток, как в бинарном корпусе.
+EMPTY, PERCEPTION = ord('.'), ord('P')
+SENTINEL, AGENT, BACKDOOR, KEYMAKER = ord('S'), ord('A'), ord('B'), ord('K')
+PASSABLE = (EMPTY, BACKDOOR, KEYMAKER)
+
+SENTINEL_ZONE = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+AGENT_ZONE = SENTINEL_ZONE + [(1, 1), (-1, -1), (1, -1), (-1, 1)]
+
+
+def place_random(grids, active, code, rng):
+    """
+    В каждой активной карте ставит code на случайную свободную клетку '.'
+    (то же распределение, что у цикла while True в generate_random_map).
+    Возвращает маску (N, n, n) поставленных клеток.
+    """
+    count, n, _ = grids.shape
+    flat = grids.reshape(count, n * n)
+    keys = rng.random((count, n * n), dtype=np.float32)
+    keys *= flat == EMPTY
+    cells = keys.argmax(axis=1)
+    ok = active & (keys[np.arange(count), cells] > 0)
+    rows, cells = np.flatnonzero(ok), cells[ok]
+    flat[rows, cells] = code
+    placed = np.zeros((count, n * n), dtype=bool)
+    placed[rows, cells] = True
+    return placed.reshape(count, n, n)
+
+
+def add_perception(grids, placed, zone):
+    """Зоны восприятия сдвигами маски поставленных клеток (через рамку из нулей)."""
+    count, n, _ = placed.shape
+    padded = np.zeros((count, n + 2, n + 2), dtype=bool)
+    padded[:, 1:-1, 1:-1] = placed
+    zone_mask = np.zeros_like(placed)
+    for dx, dy in zone:
+        zone_mask |= padded[:, 1 - dy:1 - dy + n, 1 - dx:1 - dx + n]
+    np.putmask(grids, zone_mask & (grids == EMPTY), PERCEPTION)
+
+
+# Сколько раз generate_maps догенерирует карты, где не нашлось места для B или K
+MAX_REGENERATE_ROUNDS = 100
+
+
+def generate_batch(count, rng, grid_size=9, sentinel_chance=0.5, max_agents=3):
+    """
+    Одна стопка карт generate_maps. Возвращает (grids, keymaker, perception_variant, valid):
+    valid - карты, где Backdoor Key и Keymaker поставлены (при большой плотности врагов
+    свободных клеток может не остаться).
+    """
+    grids = np.full((count, grid_size, grid_size), EMPTY, dtype=np.uint8)
+    everyone = np.ones(count, dtype=bool)
+
+    placed = place_random(grids, rng.random(count) < sentinel_chance, SENTINEL, rng)
+    add_perception(grids, placed, SENTINEL_ZONE)
+
+    num_agents = rng.integers(0, max_agents + 1, size=count)
+    for k in range(max_agents):
+        placed = place_random(grids, num_agents > k, AGENT, rng)
+        add_perception(grids, placed, AGENT_ZONE)
+
+    backdoor_mask = place_random(grids, everyone, BACKDOOR, rng).reshape(count, -1)
+    keymaker_mask = place_random(grids, everyone, KEYMAKER, rng).reshape(count, -1)
+    cells = keymaker_mask.argmax(axis=1)
+    keymaker = np.stack([cells % grid_size, cells // grid_size], axis=1)
+    perception_variant = rng.integers(1, 3, size=count).astype(np.uint8)
+    valid = backdoor_mask.any(axis=1) & keymaker_mask.any(axis=1)
+    return grids, keymaker, perception_variant, valid
+
+
+def generate_maps(count, seed=None, grid_size=9, sentinel_chance=0.5, max_agents=3):
+    """
+    Пакетный аналог generate_random_map: Sentinel с вероятностью sentinel_chance,
+    0..max_agents агентов Smith, затем Backdoor Key и Keymaker на свободные клетки.
+    Карты без места для B или K отбрасываются и догенерируются; ValueError, если
+    за MAX_REGENERATE_ROUNDS стопок не набралось count карт.
+    Возвращает (grids (N, n, n) uint8, keymaker (N, 2) [x, y], perception_variant (N,)).
+    """
+    rng = np.random.default_rng(seed)
+    parts, total = [], 0
+    for _ in range(MAX_REGENERATE_ROUNDS):
+        grids, keymaker, variants, valid = generate_batch(count - total, rng, grid_size, sentinel_chance, max_agents)
+        parts.append((grids[valid], keymaker[valid], variants[valid]))
+        total += int(valid.sum())
+        if total == count:
+            break
+    else:
+        raise ValueError(
+            f"up to {max_agents} agents leave no room for the Backdoor Key and Keymaker "
+            f"on {grid_size}x{grid_size} grids ({total} of {count} maps generated)"
+        )
+    if len(parts) == 1:
+        return parts[0]
+    return tuple(np.concatenate(arrays) for arrays in zip(*parts))
+
+
+def bfs_batch(grids, keymaker, start=(0, 0)):
+    """
+    BFS по всей стопке карт сразу, та же семантика, что у bfs(): ходы по 4 направлениям,
+    проходимы '.', 'B', 'K', стартовая клетка посещена всегда. Каждая строка карты — битовая
+    маска uint64, фронт расширяется сдвигами. Возвращает длины путей (N,) int16, -1 если недостижимо.
+    """
+    count, n, _ = grids.shape
+    if n > 64:
+        raise ValueError("bfs_batch supports grids up to 64x64")
+    weights = np.left_shift(np.uint64(1), np.arange(n, dtype=np.uint64))
+    passable = np.isin(grids, PASSABLE)
+    passable_rows = (passable * weights).sum(axis=2, dtype=np.uint64)
+    row_mask = np.uint64((1 << n) - 1) if n < 64 else np.uint64(0xFFFFFFFFFFFFFFFF)
+
+    goal = np.zeros((count, n), dtype=np.uint64)
+    goal[np.arange(count), keymaker[:, 1]] = np.left_shift(np.uint64(1), keymaker[:, 0].astype(np.uint64))
+    dist = np.full(count, -1, dtype=np.int16)
+
+    frontier = np.zeros((count, n), dtype=np.uint64)
+    frontier[:, start[1]] = np.uint64(1) << np.uint64(start[0])
+    visited = frontier.copy()
+    alive = np.arange(count)
+    one = np.uint64(1)
+
+    for step in range(n * n + 1):
+        reached = (frontier & goal).any(axis=1)
+        dist[alive[reached]] = step
+        # Готовые карты и карты с пустым фронтом выбывают из дальнейших шагов
+        keep = ~reached & frontier.any(axis=1)
+        if not keep.any():
+            break
+        if not keep.all():
+            alive, frontier, visited = alive[keep], frontier[keep], visited[keep]
+            goal, passable_rows = goal[keep], passable_rows[keep]
+        grown = ((frontier << one) | (frontier >> one)) & row_mask
+        grown[:, 1:] |= frontier[:, :-1]
+        grown[:, :-1] |= frontier[:, 1:]
+        frontier = grown & passable_rows & ~visited
+        visited |= frontier
+    return dist
+
+
+def to_tests(grids, keymaker, perception_variant, expected):
+    """Карты в формате tests.txt (список dict), для небольших наборов."""
+    return [
+        {
+            'perception_variant': int(perception_variant[i]),
+            'grid': [[chr(c) for c in row] for row in grids[i]],
+            'keymaker_pos': [int(keymaker[i, 0]), int(keymaker[i, 1])],
+            'expected_path_length': int(expected[i])
+        }
+        for i in range(len(grids))
+    ]
+
+
+def labelled_chunk(size, seed, grid_size=9):
+    grids, keymaker, variants = generate_maps(size, seed, grid_size)
+    return grids, keymaker, variants, bfs_batch(grids, keymaker)
+
+
+def generate_labelled(count, seed=None, grid_size=9, chunk=200000, workers=1):
+    """
+    count карт с ответами оракула, кусками по chunk карт. У каждого куска свой поток
+    случайных чисел из SeedSequence(seed), поэтому результат не зависит от числа процессов.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(-(-count // chunk))
+    sizes = [min(chunk, count - offset) for offset in range(0, count, chunk)]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(labelled_chunk, sizes, seeds, [grid_size] * len(sizes)))
+    else:
+        chunks = [labelled_chunk(size, s, grid_size) for size, s in zip(sizes, seeds)]
+    return tuple(np.concatenate(parts) for parts in zip(*chunks))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk map generator with a batched BFS oracle")
+    parser.add_argument("count", type=int)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--grid-size", type=int, default=9)
+    parser.add_argument("--chunk", type=int, default=200000, help="maps generated per NumPy batch")
+    parser.add_argument("--out", default="tests.bin", help="binary corpus file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    grids, keymaker, variants, expected = generate_labelled(
+        args.count, args.seed, args.grid_size, args.chunk, args.workers
+    )
+    generated = time.perf_counter() - start
+    write_corpus_arrays(args.out, variants, keymaker, expected, grids)
+    print(f"Generated {args.count} maps in {generated:.2f} s, wrote {args.out} "
+          f"({(expected >= 0).mean() * 100:.1f}% reachable)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+# Кэш результатов запусков, адресуемый содержимым.
+# Ключ: sha256 исполняемого файла решателя + sha1 входа решателя (map_to_input: вариант восприятия,
+# Keymaker и поле) + режим замера (процесс на карту или постоянный процесс, привязка к ядрам, число
+# параллельных запусков): времена из разных режимов несравнимы и друг за друга не выдаются.
+# Пересобранный решатель или измененная карта дают новый ключ и запускаются заново,
+# все остальное берется из кэша. Один файл SQLite, чтобы корпус из миллиона карт не плодил файлы.
+# Тайм-ауты тоже кэшируются и переиспользуются, пока тайм-аут запуска не больше сохраненного времени.
+
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def input_hash(input_data):
+    return hashlib.sha1(input_data.encode()).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, path="results.db"):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self._binaries = {}
+        self._db = sqlite3.connect(path)
+        # Таблица results (без режима замера) из старых версий не используется
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS measurements ("
+            " binary TEXT, input TEXT, mode TEXT, path_length INTEGER, exec_time REAL,"
+            " user_time REAL, sys_time REAL, max_rss_kb INTEGER, timed_out INTEGER, created REAL,"
+            " PRIMARY KEY (binary, input, mode))"
+        )
+
+    def binary_hash(self, program_path):
+        """Хэш бинарника, пересчитывается только при изменении размера или mtime файла."""
+        stat = os.stat(program_path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        cached = self._binaries.get(program_path)
+        if cached is None or cached[0] != signature:
+            cached = (signature, file_hash(program_path))
+            self._binaries[program_path] = cached
+        return cached[1]
+
+    def key(self, program_path, input_data, mode="process"):
+        return self.binary_hash(program_path), input_hash(input_data), mode
+
+    def get(self, key, timeout=None):
+        """
+        (path_length, exec_time, usage, timed_out) или None.
+        Сохраненный тайм-аут с временем меньше текущего timeout считается промахом:
+        с большим тайм-аутом решатель может успеть.
+        """
+        row = self._db.execute(
+            "SELECT path_length, exec_time, user_time, sys_time, max_rss_kb, timed_out FROM measurements"
+            " WHERE binary = ? AND input = ? AND mode = ?", key
+        ).fetchone()
+        if row is None or (row[5] and timeout is not None and row[1] < timeout):
+            self.misses += 1
+            return None
+        self.hits += 1
+        path_length, exec_time, user_time, sys_time, max_rss_kb, timed_out = row
+        usage = {'user': user_time, 'sys': sys_time, 'max_rss_kb': max_rss_kb}
+        return path_length, exec_time, usage, bool(timed_out)
+
+    def put(self, key, path_length, exec_time, usage, timed_out=False):
+        self.stored += 1
+        self._db.execute(
+            "INSERT OR REPLACE INTO measurements VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (*key, path_length, exec_time, usage['user'], usage['sys'], usage['max_rss_kb'], int(timed_out),
+             time.time())
+        )
+
+    def commit(self):
+        self._db.commit()
+
+    def close(self):
+        self._db.commit()
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
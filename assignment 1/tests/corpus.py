@@ -0,0 +1,153 @@
+import argparse
+import json
+import mmap
+import random
+import struct
+
+# Бинарный корпус тестов.
+# Заголовок файла: magic, версия, размер поля, число записей.
+# Запись фиксированного размера: perception_variant, keymaker x, keymaker y,
+# expected_path_length (-1 = недостижимо), затем grid_size * grid_size байт, один байт на клетку.
+MAGIC = b"MXC1"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sHHI")
+RECORD_HEADER = struct.Struct("<BBBh")
+
+
+def record_size(grid_size):
+    return RECORD_HEADER.size + grid_size * grid_size
+
+
+def encode_record(test, grid_size):
+    kx, ky = test['keymaker_pos']
+    header = RECORD_HEADER.pack(test['perception_variant'], kx, ky, test['expected_path_length'])
+    cells = "".join("".join(row) for row in test['grid']).encode("ascii")
+    if len(cells) != grid_size * grid_size:
+        raise ValueError(f"Grid must be {grid_size}x{grid_size}")
+    return header + cells
+
+
+def write_corpus(path, tests, grid_size=9):
+    """Записывает тесты (итерируемые dict как в tests.txt) потоково, без загрузки всех в память."""
+    count = 0
+    with open(path, "wb") as f:
+        f.write(FILE_HEADER.pack(MAGIC, VERSION, grid_size, 0))
+        for test in tests:
+            f.write(encode_record(test, grid_size))
+            count += 1
+        f.seek(0)
+        f.write(FILE_HEADER.pack(MAGIC, VERSION, grid_size, count))
+    return count
+
+
+def write_corpus_arrays(path, variants, keymaker, expected, grids):
+    """Быстрая запись из массивов NumPy (см. bulk.py): все записи одним блоком байт."""
+    import numpy as np
+
+    count, grid_size, _ = grids.shape
+    records = np.zeros((count, record_size(grid_size)), dtype=np.uint8)
+    records[:, 0] = variants
+    records[:, 1:3] = keymaker
+    records[:, 3:5] = expected.astype("<i2").view(np.uint8).reshape(count, 2)
+    records[:, RECORD_HEADER.size:] = grids.reshape(count, -1)
+    with open(path, "wb") as f:
+        f.write(FILE_HEADER.pack(MAGIC, VERSION, grid_size, count))
+        f.write(records.tobytes())
+    return count
+
+
+class Corpus:
+    """
+    Корпус, отображенный в память: записи читаются лениво по индексу,
+    поэтому выборка и шардинг не загружают весь файл.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.grid_size, self.count = FILE_HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a test corpus")
+        self.record_size = record_size(self.grid_size)
+
+    def __len__(self):
+        return self.count
+
+    def raw(self, index):
+        """Байты записи (заголовок + клетки) без декодирования."""
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        offset = FILE_HEADER.size + index * self.record_size
+        return self._map[offset:offset + self.record_size]
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        record = self.raw(index)
+        variant, kx, ky, expected = RECORD_HEADER.unpack_from(record, 0)
+        cells = record[RECORD_HEADER.size:].decode("ascii")
+        n = self.grid_size
+        return {
+            'perception_variant': variant,
+            'grid': [list(cells[y * n:(y + 1) * n]) for y in range(n)],
+            'keymaker_pos': [kx, ky],
+            'expected_path_length': expected
+        }
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+    def iter_range(self, start, stop=None):
+        for index in range(start, min(stop if stop is not None else self.count, self.count)):
+            yield self[index]
+
+    def sample(self, k, seed=0):
+        for index in sorted(random.Random(seed).sample(range(self.count), min(k, self.count))):
+            yield self[index]
+
+    def shard(self, index, count):
+        """Непрерывный кусок index из count (0 <= index < count)."""
+        size = -(-self.count // count)
+        return self.iter_range(index * size, (index + 1) * size)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def convert_json(json_path, corpus_path):
+    with open(json_path, "r") as f:
+        tests = json.load(f)
+    grid_size = len(tests[0]['grid']) if tests else 9
+    return write_corpus(corpus_path, tests, grid_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Binary test corpus tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    convert = sub.add_parser("convert", help="convert tests.txt (JSON) to a binary corpus")
+    convert.add_argument("json_path")
+    convert.add_argument("corpus_path")
+    info = sub.add_parser("info", help="show corpus size and the first record")
+    info.add_argument("corpus_path")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        count = convert_json(args.json_path, args.corpus_path)
+        print(f"Wrote {count} tests to {args.corpus_path}")
+    elif args.command == "info":
+        with Corpus(args.corpus_path) as corpus:
+            print(f"{len(corpus)} tests, grid {corpus.grid_size}x{corpus.grid_size}, {corpus.record_size} bytes per test")
+            if len(corpus):
+                print(corpus[0])
+
+
+if __name__ == "__main__":
+    main()
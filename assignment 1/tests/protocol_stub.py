@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+import argparse
+import sys
+
+import tests
+
+# Эталонный решатель пакетного протокола (см. комментарий над PersistentSolver в tests.py).
+# Путь считается BFS харнесса, поэтому вывод всегда совпадает с ожидаемым.
+# Без "#batch 1" в первой строке работает как обычный решатель: одна карта на процесс.
+# python protocol_stub.py --check прогоняет карты через оба режима харнесса и сравнивает результаты.
+
+
+def solve(lines):
+    """lines: вывод map_to_input() построчно. Возвращает длину кратчайшего пути или -1."""
+    keymaker = [int(part) for part in lines[1].split()]
+    size = keymaker[2] if len(keymaker) > 2 else tests.GRID_SIZE
+    grid = lines[2:2 + size]
+    return tests.bfs(grid, (0, 0), (keymaker[0], keymaker[1]))
+
+
+def serve(stdin, stdout):
+    first = stdin.readline()
+    if first.strip() != "#batch 1":
+        lines = [first.rstrip("\n")] + stdin.read().splitlines()
+        stdout.write(f"e {solve(lines)}\n")
+        return
+    stdout.write("#ready\n")
+    stdout.flush()
+    case_id, lines = None, []
+    for line in stdin:
+        line = line.rstrip("\n")
+        if line.startswith("#case"):
+            case_id, lines = line.split()[1], []
+        elif line == "#end":
+            stdout.write(f"e {solve(lines)}\n#done {case_id}\n")
+            stdout.flush()
+        elif line == "#quit":
+            break
+        else:
+            lines.append(line)
+
+
+def check(count=20, workers=2, seed=0):
+    """Одни и те же карты через постоянные процессы и по процессу на карту: результаты должны совпасть."""
+    tests.random.seed(seed)
+    cases = []
+    for _ in range(count):
+        grid, start_pos, keymaker_pos = tests.generate_random_map()
+        cases.append({
+            'perception_variant': tests.random.choice([1, 2]),
+            'grid': grid,
+            'keymaker_pos': keymaker_pos,
+            'expected_path_length': tests.bfs(grid, start_pos, keymaker_pos)
+        })
+    probe = tests.PersistentSolver('stub')
+    probe.close()
+    if not probe.supported:
+        print("protocol stub did not answer #ready")
+        return False
+    persistent = list(tests.run_test_cases('stub', cases, workers, persistent=True))
+    one_shot = list(tests.run_test_cases('stub', cases, workers))
+    mismatches = [
+        index for index, (a, b) in enumerate(zip(persistent, one_shot))
+        if a[2] != b[2] or a[2] != cases[index]['expected_path_length']
+    ]
+    for index in mismatches:
+        print(f"map {index}: persistent {persistent[index][1:3]}, one process {one_shot[index][1:3]}, "
+              f"expected {cases[index]['expected_path_length']}")
+    print(f"Protocol check: {count - len(mismatches)} / {count} maps match")
+    return not mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reference solver for the batch protocol")
+    parser.add_argument("--check", action="store_true", help="run random maps through both harness modes and compare")
+    parser.add_argument("--maps", type=int, default=20, help="number of maps for --check")
+    parser.add_argument("--workers", type=int, default=2, help="solver processes for --check")
+    parser.add_argument("--seed", type=int, default=0, help="map seed for --check")
+    args = parser.parse_args()
+    if args.check:
+        sys.exit(0 if check(args.maps, args.workers, args.seed) else 1)
+    serve(sys.stdin, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import tests
+
+# Регрессионные замеры решателей.
+# Каждая карта запускается warmup раз без учета и repeats раз с замером; по карте берется медиана.
+# Результаты сохраняются в JSON (базовая линия) и сравниваются попарно по картам:
+# относительное изменение = среднее log(new / base) по картам, доверительный интервал - бутстрэп по картам.
+METRICS = ('wall', 'cpu')
+
+
+def map_key(test):
+    """Ключ карты, не зависящий от порядка тестов: сравнение идет по одинаковым картам."""
+    record = json.dumps([test['perception_variant'], test['keymaker_pos'], test['grid']])
+    return hashlib.sha1(record.encode()).hexdigest()[:16]
+
+
+def measure(algorithm, test_list, repeats=5, warmup=1, workers=1, pin_cpus=False, persistent=False, timeout=20):
+    """
+    Возвращает {map_key: {'wall': [...], 'cpu': [...], 'success': bool}}.
+    Повторы одной карты идут подряд через run_test_cases (тот же пиннинг и постоянные процессы).
+    """
+    runs = warmup + repeats
+    repeated = (test for test in test_list for _ in range(runs))
+    results = tests.run_test_cases(algorithm, repeated, workers, pin_cpus, timeout, persistent)
+    samples = {}
+    for index, (exec_time, success, _, usage) in enumerate(results):
+        test = test_list[index // runs]
+        entry = samples.setdefault(map_key(test), {'wall': [], 'cpu': [], 'success': True})
+        if index % runs < warmup:
+            continue
+        if exec_time is None or not success:
+            entry['success'] = False
+            continue
+        entry['wall'].append(exec_time)
+        if usage['user'] is not None:
+            entry['cpu'].append(usage['user'] + usage['sys'])
+    return samples
+
+
+def medians(samples, metric):
+    return {key: float(np.median(entry[metric])) for key, entry in samples.items() if entry[metric]}
+
+
+def bootstrap_ci(values, statistic=np.mean, resamples=2000, confidence=0.95, seed=0):
+    """Перцентильный бутстрэп-интервал статистики по выборке values."""
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return None, None
+    rng = np.random.default_rng(seed)
+    indices = rng.integers(0, len(values), size=(resamples, len(values)))
+    stats = statistic(values[indices], axis=1)
+    alpha = (1 - confidence) / 2
+    return float(np.quantile(stats, alpha)), float(np.quantile(stats, 1 - alpha))
+
+
+def summarize(samples, metric='wall', resamples=2000):
+    """Среднее по картам медианных времен с доверительным интервалом."""
+    values = list(medians(samples, metric).values())
+    low, high = bootstrap_ci(values, resamples=resamples)
+    return {
+        'maps': len(values),
+        'mean': float(np.mean(values)) if values else None,
+        'ci': (low, high),
+        'failed_maps': sum(not entry['success'] for entry in samples.values())
+    }
+
+
+def compare(base, new, metric='wall', resamples=2000):
+    """
+    Попарное сравнение по общим картам. change - относительное изменение (0.05 = на 5% медленнее),
+    как exp(среднего log-отношения), и его доверительный интервал.
+    """
+    base_medians, new_medians = medians(base, metric), medians(new, metric)
+    common = sorted(set(base_medians) & set(new_medians))
+    ratios = np.array([
+        np.log(new_medians[key] / base_medians[key])
+        for key in common if base_medians[key] > 0 and new_medians[key] > 0
+    ])
+    diffs = np.array([new_medians[key] - base_medians[key] for key in common])
+    if len(ratios) == 0:
+        return {'maps': 0, 'change': None, 'ci': (None, None), 'mean_diff': None, 'slower_maps': 0}
+    low, high = bootstrap_ci(ratios, resamples=resamples)
+    return {
+        'maps': len(common),
+        'change': float(np.expm1(ratios.mean())),
+        'ci': (float(np.expm1(low)), float(np.expm1(high))),
+        'mean_diff': float(diffs.mean()),
+        'slower_maps': int((diffs > 0).sum())
+    }
+
+
+def is_regression(comparison, threshold):
+    """Регрессия, только если весь доверительный интервал выше порога: шум не валит проверку."""
+    low = comparison['ci'][0]
+    return low is not None and low > threshold
+
+
+def save_results(path, algorithm, samples, repeats, warmup):
+    data = {
+        'algorithm': algorithm,
+        'program': tests.CPLUSPLUS_PROGRAMS[algorithm],
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'repeats': repeats,
+        'warmup': warmup,
+        'samples': samples
+    }
+    with open(path + '.tmp', 'w') as f:
+        json.dump(data, f)
+    # Атомарная замена, чтобы прерванный запуск не портил базовую линию
+    os.replace(path + '.tmp', path)
+
+
+def load_results(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def print_summary(name, samples, metric):
+    summary = summarize(samples, metric)
+    if summary['mean'] is None:
+        print(f"{name}: no successful runs")
+        return
+    low, high = summary['ci']
+    print(f"{name}: {summary['maps']} maps, mean {metric} {summary['mean'] * 1000:.3f} ms "
+          f"(95% CI {low * 1000:.3f} - {high * 1000:.3f}), failed maps: {summary['failed_maps']}")
+
+
+def print_comparison(base_name, new_name, comparison, metric):
+    if comparison['change'] is None:
+        print("No common maps to compare.")
+        return
+    low, high = comparison['ci']
+    print(f"{new_name} vs {base_name} ({metric}, {comparison['maps']} paired maps): "
+          f"{comparison['change'] * 100:+.2f}% (95% CI {low * 100:+.2f}% .. {high * 100:+.2f}%), "
+          f"mean diff {comparison['mean_diff'] * 1000:+.3f} ms, slower on {comparison['slower_maps']} maps")
+
+
+def run_measurement(args, algorithm):
+    if args.binary:
+        tests.CPLUSPLUS_PROGRAMS[algorithm] = args.binary
+    test_iter, _ = tests.load_tests(args.tests, args.sample)
+    test_list = list(test_iter)
+    return measure(algorithm, test_list, args.repeats, args.warmup, args.workers, args.pin, args.persistent)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark regression gate for the solver binaries")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_measure_args(p):
+        p.add_argument("algorithm", choices=sorted(tests.CPLUSPLUS_PROGRAMS))
+        p.add_argument("--binary", default=None, help="use this executable instead of the default one (another build)")
+        p.add_argument("--tests", default="tests.txt")
+        p.add_argument("--sample", type=int, default=100, help="number of maps (random sample)")
+        p.add_argument("--repeats", type=int, default=5, help="measured runs per map")
+        p.add_argument("--warmup", type=int, default=1, help="discarded runs per map")
+        p.add_argument("--workers", type=int, default=1, help="parallel runs (1 gives the least noise)")
+        p.add_argument("--pin", action="store_true")
+        p.add_argument("--persistent", action="store_true")
+        p.add_argument("--metric", choices=METRICS, default="wall")
+
+    run = sub.add_parser("run", help="measure one solver and save the results")
+    add_measure_args(run)
+    run.add_argument("--out", required=True, help="results / baseline JSON file")
+
+    cmp_parser = sub.add_parser("compare", help="paired comparison of two result files (e.g. astar vs backtracking)")
+    cmp_parser.add_argument("base")
+    cmp_parser.add_argument("new")
+    cmp_parser.add_argument("--metric", choices=METRICS, default="wall")
+    cmp_parser.add_argument("--threshold", type=float, default=None, help="fail if slower by more than this percent")
+
+    check = sub.add_parser("check", help="measure a solver and fail if it regressed against a baseline")
+    add_measure_args(check)
+    check.add_argument("--baseline", required=True)
+    check.add_argument("--threshold", type=float, default=5.0, help="allowed slowdown in percent")
+    check.add_argument("--update", action="store_true", help="overwrite the baseline when the check passes")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        samples = run_measurement(args, args.algorithm)
+        save_results(args.out, args.algorithm, samples, args.repeats, args.warmup)
+        print_summary(args.algorithm, samples, args.metric)
+        print(f"Saved results to {args.out}")
+        return 0
+
+    if args.command == "compare":
+        base, new = load_results(args.base), load_results(args.new)
+        base_name, new_name = f"{base['algorithm']} ({args.base})", f"{new['algorithm']} ({args.new})"
+        base_samples, new_samples = base['samples'], new['samples']
+    else:
+        base = load_results(args.baseline)
+        base_name, new_name = f"baseline ({args.baseline})", f"{args.algorithm} (current)"
+        base_samples = base['samples']
+        new_samples = run_measurement(args, args.algorithm)
+
+    print_summary(base_name, base_samples, args.metric)
+    print_summary(new_name, new_samples, args.metric)
+    comparison = compare(base_samples, new_samples, args.metric)
+    print_comparison(base_name, new_name, comparison, args.metric)
+
+    if args.threshold is not None and is_regression(comparison, args.threshold / 100):
+        print(f"REGRESSION: slower than {args.threshold:.1f}% with 95% confidence")
+        return 1
+    if args.command == "check" and args.update:
+        save_results(args.baseline, args.algorithm, new_samples, args.repeats, args.warmup)
+        print(f"Baseline {args.baseline} updated")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
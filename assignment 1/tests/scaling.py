@@ -0,0 +1,183 @@
+import argparse
+import csv
+import os
+
+import numpy as np
+
+import tests
+from bulk import bfs_batch, generate_maps, to_tests
+
+# Замеры масштабирования решателей по размеру поля и плотности врагов.
+# Плотность - максимальное число агентов Smith на клетку: на поле n x n ставится
+# от 0 до round(density * n * n) агентов (как "до 3 агентов" на поле 9x9, density ~ 0.037).
+# Поля не 9x9 получают только решатели из tests.SIZE_AWARE_PROGRAMS (или отмеченные --size-aware):
+# остальные читают ровно 9 строк, и их замеры на других размерах бессмысленны.
+SIZES = [5, 9, 13, 17, 25]
+
+
+def scaling_maps(grid_size, density, count, seed=None, sentinel_chance=0.5):
+    """count карт заданного размера и плотности с ответами BFS-оракула (формат tests.txt)."""
+    max_agents = max(0, round(density * grid_size * grid_size))
+    grids, keymaker, variants = generate_maps(count, seed, grid_size, sentinel_chance, max_agents)
+    expected = bfs_batch(grids, keymaker)
+    return to_tests(grids, keymaker, variants, expected)
+
+
+def measure_point(algorithm, test_list, workers=1, pin_cpus=False, timeout=20):
+    """Медианы времени, процессорного времени и пиковой памяти по картам одной точки."""
+    times, cpu_times, rss, successes = [], [], [], []
+    for exec_time, success, _, usage in tests.run_test_cases(algorithm, test_list, workers, pin_cpus, timeout):
+        if exec_time is None:
+            continue
+        times.append(exec_time)
+        successes.append(success)
+        if usage['user'] is not None:
+            cpu_times.append(usage['user'] + usage['sys'])
+        if usage['max_rss_kb'] is not None:
+            rss.append(usage['max_rss_kb'])
+    return {
+        'maps': len(times),
+        'median_time': float(np.median(times)) if times else None,
+        'median_cpu': float(np.median(cpu_times)) if cpu_times else None,
+        'median_rss_kb': float(np.median(rss)) if rss else None,
+        'success_rate': float(np.mean(successes)) if successes else None
+    }
+
+
+def fit_complexity(sizes, values):
+    """
+    Эмпирическая сложность по размеру поля n: степенная модель value ~ c * n^k (прямая в log-log)
+    и экспонента value ~ c * e^(k n) (прямая в log-lin). Возвращает лучшую модель по R^2.
+    """
+    points = [(n, v) for n, v in zip(sizes, values) if v is not None and v > 0]
+    if len(points) < 2:
+        return None
+    n = np.array([p[0] for p in points], dtype=float)
+    log_v = np.log([p[1] for p in points])
+
+    def fit(x):
+        slope, intercept = np.polyfit(x, log_v, 1)
+        residual = log_v - (slope * x + intercept)
+        total = ((log_v - log_v.mean()) ** 2).sum()
+        r2 = 1 - (residual ** 2).sum() / total if total > 0 else 1.0
+        return slope, r2
+
+    power, power_r2 = fit(np.log(n))
+    growth, exp_r2 = fit(n)
+    if exp_r2 > power_r2:
+        return {'model': 'exponential', 'k': float(growth), 'r2': float(exp_r2), 'label': f"e^({growth:.3f} n)"}
+    return {'model': 'power', 'k': float(power), 'r2': float(power_r2), 'label': f"n^{power:.2f}"}
+
+
+def run_scaling(algorithms, sizes, densities, maps, seed=0, workers=1, pin_cpus=False, timeout=20, size_aware=()):
+    """Строки результатов: одна на (алгоритм, размер, плотность). Карты одинаковые для всех алгоритмов."""
+    fixed = [a for a in algorithms if a not in tests.SIZE_AWARE_PROGRAMS and a not in size_aware]
+    if fixed and any(size != tests.GRID_SIZE for size in sizes):
+        raise ValueError(f"{', '.join(fixed)}: only {tests.GRID_SIZE}x{tests.GRID_SIZE} grids are supported; "
+                         f"use --sizes {tests.GRID_SIZE} or mark the solver with --size-aware")
+    rows = []
+    for size in sizes:
+        if size > 64:
+            raise ValueError("grid sizes above 64 are not supported by the BFS oracle")
+        for density in densities:
+            test_list = scaling_maps(size, density, maps, seed)
+            reachable = sum(test['expected_path_length'] >= 0 for test in test_list) / len(test_list)
+            for algorithm in algorithms:
+                point = measure_point(algorithm, test_list, workers, pin_cpus, timeout)
+                rows.append({'algorithm': algorithm, 'grid_size': size, 'density': density,
+                             'reachable': reachable, **point})
+                if point['median_time'] is not None:
+                    print(f"{algorithm} {size}x{size} density {density}: median {point['median_time']:.4f} s, "
+                          f"success {point['success_rate'] * 100:.1f}%, RSS {point['median_rss_kb']} KB")
+    return rows
+
+
+def complexity_table(rows, metric='median_time'):
+    """Подгонка сложности по размеру поля для каждой пары (алгоритм, плотность)."""
+    fits = []
+    for algorithm in sorted({row['algorithm'] for row in rows}):
+        for density in sorted({row['density'] for row in rows}):
+            points = sorted(
+                (row['grid_size'], row[metric]) for row in rows
+                if row['algorithm'] == algorithm and row['density'] == density
+            )
+            fit = fit_complexity([p[0] for p in points], [p[1] for p in points])
+            if fit is not None:
+                fits.append((algorithm, density, fit))
+    return fits
+
+
+def write_rows(path, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def plot_curves(rows, path):
+    """Кривые времени и памяти от размера поля; matplotlib нужен только здесь."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, (ax_time, ax_rss) = plt.subplots(1, 2, figsize=(12, 5))
+    for algorithm in sorted({row['algorithm'] for row in rows}):
+        for density in sorted({row['density'] for row in rows}):
+            points = sorted(
+                (row['grid_size'], row['median_time'], row['median_rss_kb']) for row in rows
+                if row['algorithm'] == algorithm and row['density'] == density and row['median_time'] is not None
+            )
+            if not points:
+                continue
+            label = f"{algorithm}, density {density}"
+            ax_time.plot([p[0] for p in points], [p[1] for p in points], marker='o', label=label)
+            ax_rss.plot([p[0] for p in points], [p[2] or 0 for p in points], marker='o', label=label)
+    ax_time.set(xlabel='Grid size', ylabel='Median time (s)', yscale='log', title='Time')
+    ax_rss.set(xlabel='Grid size', ylabel='Median peak RSS (KB)', title='Memory')
+    ax_time.legend()
+    ax_time.grid(True)
+    ax_rss.grid(True)
+    fig.tight_layout()
+    fig.savefig(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grid-size and enemy-density scaling benchmark")
+    parser.add_argument("algorithms", nargs="+", choices=sorted(tests.CPLUSPLUS_PROGRAMS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=None,
+                        help=f"grid sizes (default {' '.join(map(str, SIZES))} if every solver is size-aware, "
+                             f"else {tests.GRID_SIZE})")
+    parser.add_argument("--size-aware", nargs="+", default=[], choices=sorted(tests.CPLUSPLUS_PROGRAMS),
+                        help="solvers that read the grid size from the Keymaker line (\"x y N\")")
+    parser.add_argument("--densities", type=float, nargs="+", default=[0.037, 0.1])
+    parser.add_argument("--maps", type=int, default=50, help="maps per (size, density) point")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--pin", action="store_true")
+    parser.add_argument("--timeout", type=float, default=20)
+    parser.add_argument("--out", default="scaling.csv")
+    parser.add_argument("--plot", default=None, help="save time and memory curves to this image")
+    args = parser.parse_args()
+    size_aware = tests.SIZE_AWARE_PROGRAMS | set(args.size_aware)
+    sizes = args.sizes
+    if sizes is None:
+        sizes = SIZES if size_aware.issuperset(args.algorithms) else [tests.GRID_SIZE]
+
+    try:
+        rows = run_scaling(args.algorithms, sizes, args.densities, args.maps, args.seed,
+                           args.workers, args.pin, args.timeout, size_aware)
+    except ValueError as e:
+        parser.error(str(e))
+    write_rows(args.out, rows)
+    print(f"\nWrote {len(rows)} points to {os.path.abspath(args.out)}")
+
+    print("\nEmpirical complexity (median time vs grid size n):")
+    for algorithm, density, fit in complexity_table(rows):
+        print(f"{algorithm:>12} density {density:<6} ~ {fit['label']:<14} (R^2 {fit['r2']:.3f})")
+    if args.plot:
+        plot_curves(rows, args.plot)
+        print(f"Saved plot to {args.plot}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,27 +3,38 @@ import random
 import time
 import numpy as np
 from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import argparse
 import json
 import os
+import queue
+import sys
+import threading
+
+from cache import ResultCache
+from corpus import Corpus
 
 # Константы
 GRID_SIZE = 9
 NUM_TESTS = 1000
 CPLUSPLUS_PROGRAMS = {
     'astar': './astar',  # Путь к исполняемому файлу A*
-    'backtracking': './b'  # Путь к исполняемому файлу Backtracking
+    'backtracking': './b',  # Путь к исполняемому файлу Backtracking
+    'stub': './protocol_stub.py'  # Эталон пакетного протокола (BFS), см. protocol_stub.py
 }
+# Решатели, читающие размер поля из строки Keymaker ("x y N"); astar и b жестко рассчитаны на 9x9
+SIZE_AWARE_PROGRAMS = {'stub'}
 
 # Проверка на валидность ячейки
-def is_valid(x, y):
-    return 0 <= x < GRID_SIZE and 0 <= y < GRID_SIZE
+def is_valid(x, y, grid_size=GRID_SIZE):
+    return 0 <= x < grid_size and 0 <= y < grid_size
 
 # Добавление зон восприятия вокруг Sentinel
 def add_sentinel_perception(grid, sx, sy):
     directions = [(1, 0), (-1, 0), (0, 1), (0, -1)] 
     for dx, dy in directions:
         nx, ny = sx + dx, sy + dy
-        if is_valid(nx, ny) and grid[ny][nx] == '.':
+        if is_valid(nx, ny, len(grid)) and grid[ny][nx] == '.':
             grid[ny][nx] = 'P'
 
 # Добавление зон восприятия вокруг Agent Smith
@@ -31,44 +42,49 @@ def add_agent_perception(grid, ax, ay):
     directions = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, -1), (1, -1), (-1, 1)] 
     for dx, dy in directions:
         nx, ny = ax + dx, ay + dy
-        if is_valid(nx, ny) and grid[ny][nx] == '.':
+        if is_valid(nx, ny, len(grid)) and grid[ny][nx] == '.':
             grid[ny][nx] = 'P'
 
-# Генерация случайной карты
-def generate_random_map():
-    grid = [['.' for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
+# Случайная свободная клетка '.' или None, если свободных нет
+def random_free_cell(grid):
+    grid_size = len(grid)
+    if not any('.' in row for row in grid):
+        return None
+    while True:
+        x, y = random.randint(0, grid_size - 1), random.randint(0, grid_size - 1)
+        if grid[y][x] == '.':
+            return x, y
+
+# Генерация случайной карты.
+# По умолчанию как в задании: поле 9x9, Sentinel с шансом 50%, до 3 агентов Smith.
+# Для замеров масштабирования размер поля и число врагов задаются параметрами.
+def generate_random_map(grid_size=GRID_SIZE, sentinel_chance=0.5, max_agents=3):
+    grid = [['.' for _ in range(grid_size)] for _ in range(grid_size)]
     
     # Установка Sentinel и его восприятия
-    if random.choice([True, False]):  # 50% шанс появления Sentinel
-        while True:
-            sx, sy = random.randint(0, GRID_SIZE - 1), random.randint(0, GRID_SIZE - 1)
-            if grid[sy][sx] == '.':
-                grid[sy][sx] = 'S'
-                add_sentinel_perception(grid, sx, sy)
-                break
+    if random.random() < sentinel_chance:
+        cell = random_free_cell(grid)
+        if cell is not None:
+            sx, sy = cell
+            grid[sy][sx] = 'S'
+            add_sentinel_perception(grid, sx, sy)
     
-    # Установка Agent Smith и его восприятия (до 3 агентов)
-    num_agents = random.randint(0, 3)
+    # Установка Agent Smith и его восприятия (до max_agents агентов)
+    num_agents = random.randint(0, max_agents)
     for _ in range(num_agents):
-        while True:
-            ax, ay = random.randint(0, GRID_SIZE - 1), random.randint(0, GRID_SIZE - 1)
-            if grid[ay][ax] == '.':
-                grid[ay][ax] = 'A'
-                add_agent_perception(grid, ax, ay)
-                break
+        cell = random_free_cell(grid)
+        if cell is None:
+            break
+        ax, ay = cell
+        grid[ay][ax] = 'A'
+        add_agent_perception(grid, ax, ay)
 
     # Установка Backdoor Key на свободную клетку
-    while True:
-        bx, by = random.randint(0, GRID_SIZE - 1), random.randint(0, GRID_SIZE - 1)
-        if grid[by][bx] == '.':
-            grid[by][bx] = 'B'
-            break
+    bx, by = random_free_cell(grid)
+    grid[by][bx] = 'B'
 
-    while True:
-        kx, ky = random.randint(0, GRID_SIZE - 1), random.randint(0, GRID_SIZE - 1)
-        if grid[ky][kx] == '.':
-            grid[ky][kx] = 'K'
-            break
+    kx, ky = random_free_cell(grid)
+    grid[ky][kx] = 'K'
 
     return grid, (0, 0), (kx, ky)
 
@@ -85,83 +101,284 @@ def bfs(grid, start, goal):
         
         for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
             nx, ny = x + dx, y + dy
-            if is_valid(nx, ny) and (nx, ny) not in visited:
+            if is_valid(nx, ny, len(grid)) and (nx, ny) not in visited:
                 if grid[ny][nx] in ['.', 'B', 'K']:  
                     queue.append((nx, ny, dist + 1))
                     visited.add((nx, ny))
     return -1 
 
+# Формат: вариант восприятия, "x y" Keymaker, затем строки поля.
+# Для поля не 9x9 в строку Keymaker добавляется размер: "x y N" (решатели 9x9 читают только x y).
 def map_to_input(perception_variant, keymaker_pos, grid):
-    input_data = f"{perception_variant}\n{keymaker_pos[0]} {keymaker_pos[1]}\n"
+    size = f" {len(grid)}" if len(grid) != GRID_SIZE else ""
+    input_data = f"{perception_variant}\n{keymaker_pos[0]} {keymaker_pos[1]}{size}\n"
     for row in grid:
         input_data += ''.join(row) + '\n'
     return input_data
-def run_cpp_program(program, perception_variant, grid, start_pos, keymaker_pos, expected_path_length=None, timeout=20):  # Увеличиваем тайм-аут до 20 секунд
+# Парсинг строки "e <len>" из вывода решателя
+def parse_output(lines, expected_path_length=None):
+    success, path_length = False, -1
+    for line in lines:
+        line = line.strip()
+        if line.startswith("e"):
+            parts = line.split()
+            if len(parts) == 2 and parts[1].isdigit():
+                path_length = int(parts[1])
+                # Проверка: путь найден и совпадает с ожидаемым, если он задан
+                if expected_path_length is not None:
+                    success = (path_length == expected_path_length)
+                else:
+                    success = (path_length != -1)
+                # Логирование несоответствий
+                if expected_path_length is not None and path_length != expected_path_length:
+                    print(f"Discrepancy detected: Expected path length {expected_path_length}, but got {path_length}")
+                else:
+                    print(f"Path length matched expected: {path_length}")
+            break
+    return success, path_length
+
+# Ресурсы одного запуска: процессорное время (user/sys, секунды) и пиковая память (KB).
+# None, если ОС их не сообщает.
+def make_usage(user_time=None, sys_time=None, max_rss_kb=None):
+    return {'user': user_time, 'sys': sys_time, 'max_rss_kb': max_rss_kb}
+
+# ru_maxrss в килобайтах на Linux и в байтах на macOS
+def rusage_to_usage(rusage):
+    max_rss = rusage.ru_maxrss // 1024 if sys.platform == 'darwin' else rusage.ru_maxrss
+    return make_usage(rusage.ru_utime, rusage.ru_stime, max_rss)
+
+# Ожидание завершения процесса через os.wait4 в отдельном потоке:
+# время выхода фиксируется сразу, вместе с rusage именно этого процесса
+# (в отличие от RUSAGE_CHILDREN, это корректно и при параллельных запусках).
+def wait_with_usage(process, timeout):
+    result = {}
+
+    def reap():
+        _, status, rusage = os.wait4(process.pid, 0)
+        result['end_time'] = time.perf_counter()
+        result['status'] = status
+        result['rusage'] = rusage
+
+    waiter = threading.Thread(target=reap, daemon=True)
+    waiter.start()
+    waiter.join(timeout)
+    timed_out = waiter.is_alive()
+    if timed_out:
+        process.kill()
+        waiter.join()
+    # Процесс уже собран нами, Popen не должен вызывать waitpid повторно
+    process.returncode = os.waitstatus_to_exitcode(result['status'])
+    return timed_out, result['end_time'], result['rusage']
+
+# Ресурсы живого процесса из /proc (Linux): для постоянного решателя, который не завершается
+# после каждой карты. Пиковая память (VmHWM) - за все время жизни процесса.
+def proc_usage(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/status") as f:
+            hwm = next((int(line.split()[1]) for line in f if line.startswith("VmHWM:")), None)
+    except (OSError, ValueError, IndexError):
+        return make_usage()
+    ticks = os.sysconf("SC_CLK_TCK")
+    return make_usage(int(fields[11]) / ticks, int(fields[12]) / ticks, hwm)
+
+# Привязка к ядру в самом дочернем процессе до exec: решатель с первой инструкции работает на своем ядре
+# (sched_setaffinity после Popen оставляет окно, когда ребенок уже запущен без привязки)
+def pin_to(cpu):
+    if cpu is None:
+        return None
+    return lambda: os.sched_setaffinity(0, {cpu})
+
+def read_stream(stream, chunks):
+    chunks.append(stream.read())
+
+def run_cpp_program(program, perception_variant, grid, start_pos, keymaker_pos, expected_path_length=None, timeout=20, cpu=None):  # Увеличиваем тайм-аут до 20 секунд
     input_data = map_to_input(perception_variant, keymaker_pos, grid)
     try:
+        # Счетчик времени выполнения: монотонные часы от запуска процесса до его завершения
+        start_time = time.perf_counter()
         process = subprocess.Popen(
             [CPLUSPLUS_PROGRAMS[program]],
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True
+            text=True,
+            preexec_fn=pin_to(cpu)  # Привязка процесса к одному ядру, чтобы замеры времени были сравнимы
         )
-        
-        # Передача данных
-        process.stdin.write(input_data)
-        process.stdin.flush()
 
-        # Счетчик времени выполнения
-        start_time = time.time()
+        # Без os.wait4 (Windows) - прежний способ, только время
+        if not hasattr(os, 'wait4'):
+            try:
+                output, errors = process.communicate(input_data, timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.communicate()
+                print("Process timed out.")
+                return time.perf_counter() - start_time, False, -1, make_usage()
+            exec_time = time.perf_counter() - start_time
+            success, path_length = parse_output(output.splitlines(), expected_path_length)
+            return exec_time, success, path_length, make_usage()
+
+        # Вывод читается в потоках, чтобы процесс не блокировался на полном канале
+        output, errors = [], []
+        readers = [
+            threading.Thread(target=read_stream, args=(process.stdout, output), daemon=True),
+            threading.Thread(target=read_stream, args=(process.stderr, errors), daemon=True)
+        ]
+        for reader in readers:
+            reader.start()
 
+        # Передача данных
         try:
-            # Чтение всех выходных данных с тайм-аутом
-            output, errors = process.communicate(timeout=timeout)
-            exec_time = time.time() - start_time
-
-            # Парсинг результата
-            success, path_length = False, -1
-            for line in output.splitlines():
-                line = line.strip()
-                if line.startswith("e"):
-                    parts = line.split()
-                    if len(parts) == 2 and parts[1].isdigit():
-                        path_length = int(parts[1])
-                        # Проверка: путь найден и совпадает с ожидаемым, если он задан
-                        if expected_path_length is not None:
-                            success = (path_length == expected_path_length)
-                        else:
-                            success = (path_length != -1)
-                        # Логирование несоответствий
-                        if expected_path_length is not None and path_length != expected_path_length:
-                            print(f"Discrepancy detected: Expected path length {expected_path_length}, but got {path_length}")
-                        else:
-                            print(f"Path length matched expected: {path_length}")
-                    break
+            process.stdin.write(input_data)
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
 
-            process.terminate()
-            return exec_time, success, path_length
+        timed_out, end_time, rusage = wait_with_usage(process, timeout)
+        exec_time = end_time - start_time
+        usage = rusage_to_usage(rusage)
+        for reader in readers:
+            reader.join()
+        process.stdout.close()
+        process.stderr.close()
 
-        except subprocess.TimeoutExpired:
-            process.kill()
-            exec_time = time.time() - start_time
+        if timed_out:
             print("Process timed out.")
-            return exec_time, False, -1
+            return exec_time, False, -1, usage
+
+        # Парсинг результата
+        success, path_length = parse_output(output[0].splitlines(), expected_path_length)
+        return exec_time, success, path_length, usage
 
     except Exception as e:
         print(f"Error: {e}")
-        return None, False, -1
+        return None, False, -1, make_usage()
 
-# Функция для тестирования и сбора данных с сохранением и загрузкой тестов
-def run_tests(algorithm):
-    times, successes, path_lengths = [], [], []
+# Постоянный процесс решателя (пакетный протокол).
+# Харнесс -> решатель: "#batch 1" один раз, затем для каждой карты
+#   "#case <id>", строки map_to_input(), "#end"; в конце "#quit".
+# Решатель -> харнесс: "#ready" после "#batch 1", для каждой карты свой вывод
+#   (например "e 11") и строка "#done <id>".
+# Решатели без поддержки протокола не отвечают "#ready" и запускаются по одному процессу на карту.
+class PersistentSolver:
+    def __init__(self, program, cpu=None, handshake_timeout=2.0):
+        self.program = program
+        self.cpu = cpu
+        self.handshake_timeout = handshake_timeout
+        self.process = None
+        self.lines = None
+        self.case_id = 0
+        self.startup_time = 0.0
+        self.cpu_time = 0.0  # user + sys всех процессов этого решателя, см. _collect_cpu
+        self.supported = self.start()
+
+    def start(self):
+        start_time = time.perf_counter()
+        self.process = subprocess.Popen(
+            [CPLUSPLUS_PROGRAMS[self.program]],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+            preexec_fn=pin_to(self.cpu)
+        )
+        # Чтение stdout в отдельном потоке, чтобы ждать ответа с тайм-аутом
+        self.lines = queue.Queue()
+        threading.Thread(target=self._read_lines, args=(self.process.stdout, self.lines), daemon=True).start()
+        try:
+            self.process.stdin.write("#batch 1\n")
+            self.process.stdin.flush()
+            ready = self.lines.get(timeout=self.handshake_timeout)
+        except (OSError, queue.Empty):
+            ready = None
+        self.startup_time += time.perf_counter() - start_time
+        if ready is None or ready.strip() != "#ready":
+            self.kill()
+            return False
+        return True
+
+    @staticmethod
+    def _read_lines(stream, lines):
+        for line in stream:
+            lines.put(line)
+        lines.put(None)
+
+    def solve(self, perception_variant, grid, keymaker_pos, expected_path_length=None, timeout=20):
+        self.case_id += 1
+        frame = f"#case {self.case_id}\n" + map_to_input(perception_variant, keymaker_pos, grid) + "#end\n"
+        start_time = time.perf_counter()
+        output = []
+        try:
+            self.process.stdin.write(frame)
+            self.process.stdin.flush()
+            deadline = start_time + timeout
+            while True:
+                line = self.lines.get(timeout=max(0.0, deadline - time.perf_counter()))
+                if line is None:
+                    raise OSError("solver exited")
+                if line.strip() == f"#done {self.case_id}":
+                    break
+                output.append(line)
+        except (OSError, queue.Empty):
+            exec_time = time.perf_counter() - start_time
+            print("Process timed out.")
+            # Процесс в неизвестном состоянии: перезапуск для следующих карт
+            self.kill()
+            self.start()
+            return exec_time, False, -1, make_usage()
+        exec_time = time.perf_counter() - start_time
+        after = proc_usage(self.process.pid)
+        success, path_length = parse_output(output, expected_path_length)
+        # /proc считает время тиками (обычно 10 мс): разность за одну карту почти всегда 0,
+        # поэтому процессорное время по картам не сообщается, только суммарное (cpu_time)
+        return exec_time, success, path_length, make_usage(max_rss_kb=after['max_rss_kb'])
+
+    def _collect_cpu(self):
+        usage = proc_usage(self.process.pid)
+        if usage['user'] is not None:
+            self.cpu_time += usage['user'] + usage['sys']
+
+    def kill(self):
+        if self.process is not None and self.process.poll() is None:
+            self._collect_cpu()
+            self.process.kill()
+            self.process.wait()
+
+    def close(self):
+        if self.process is None or self.process.poll() is not None:
+            return
+        self._collect_cpu()
+        try:
+            self.process.stdin.write("#quit\n")
+            self.process.stdin.close()
+            self.process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.kill()
+
+# Загрузка тестов из tests.txt (или бинарного корпуса) или генерация новых
+def load_tests(path='tests.txt', sample=None, shard=None):
     tests = []
 
+    # Бинарный корпус читается лениво: выборка или шард без загрузки всего файла
+    if path.endswith('.bin'):
+        corpus = Corpus(path)
+        print(f"Loaded corpus {path} ({len(corpus)} tests)")
+        if sample is not None:
+            return corpus.sample(sample), min(sample, len(corpus))
+        if shard is not None:
+            index, count = shard
+            size = -(-len(corpus) // count)
+            return corpus.shard(index, count), max(0, min(size, len(corpus) - index * size))
+        return iter(corpus), len(corpus)
+
     # Проверка существования файла с тестами
-    if os.path.exists('tests.txt'):
-        with open('tests.txt', 'r') as f:
+    if os.path.exists(path):
+        with open(path, 'r') as f:
             tests = json.load(f)
-        print("Loaded tests from tests.txt")
+        print(f"Loaded tests from {path}")
     else:
         # Генерация 1000 тестов
         for _ in range(NUM_TESTS):
@@ -175,19 +392,150 @@ def run_tests(algorithm):
                 'expected_path_length': expected_path_length
             })
         # Сохранение тестов в файл
-        with open('tests.txt', 'w') as f:
+        with open(path, 'w') as f:
             json.dump(tests, f)
-        print("Generated and saved tests to tests.txt")
+        print(f"Generated and saved tests to {path}")
+    if sample is not None:
+        tests = random.Random(0).sample(tests, min(sample, len(tests)))
+    elif shard is not None:
+        index, count = shard
+        size = -(-len(tests) // count)
+        tests = tests[index * size:(index + 1) * size]
+    return iter(tests), len(tests)
+
+# Успех по длине пути, как в parse_output (для результатов из кэша):
+# "e -1" там не разбирается как длина, поэтому недостижимая цель никогда не успех
+def path_matches(path_length, expected_path_length=None):
+    if path_length == -1:
+        return False
+    if expected_path_length is not None:
+        return path_length == expected_path_length
+    return path_length != -1
+
+# Параллельный запуск тестов: результаты возвращаются в порядке тестов.
+# С cache (ResultCache) карты, уже запускавшиеся этим же бинарником, не запускаются повторно;
+# force=True перезапускает все и перезаписывает кэш.
+def measurement_mode(persistent, cpus, workers):
+    """Режим замера для ключа кэша: времена разных режимов несравнимы."""
+    process = 'persistent' if persistent else 'process'
+    pinning = 'pinned' if cpus and cpus[0] is not None else 'shared'
+    return f"{process}-{pinning}-w{workers}"
+
+def run_test_cases(algorithm, tests, workers=1, pin_cpus=False, timeout=20, persistent=False, cache=None, force=False):
+    workers = max(1, workers)
+    cpus = [None] * workers
+    if pin_cpus and hasattr(os, 'sched_setaffinity'):
+        available = sorted(os.sched_getaffinity(0))
+        workers = min(workers, len(available))
+        cpus = available[:workers]
+
+    # Каждый поток берет из очереди свое ядро (и свой постоянный процесс решателя)
+    slots = queue.Queue()
+    solvers = []
+    if persistent:
+        # Сначала один процесс: без протокола он ждет весь тайм-аут рукопожатия, и ждать его на каждом ядре незачем
+        probe = PersistentSolver(algorithm, cpus[0])
+        if probe.supported:
+            solvers = [probe] + [PersistentSolver(algorithm, cpu) for cpu in cpus[1:]]
+        if solvers and all(solver.supported for solver in solvers):
+            startup = sum(solver.startup_time for solver in solvers)
+            print(f"Persistent solver: {len(solvers)} processes, startup {startup:.4f} seconds total")
+        else:
+            print(f"{algorithm} does not support the batch protocol, running one process per map")
+            for solver in solvers:
+                solver.close()
+            solvers = []
+    for slot in (solvers or cpus):
+        slots.put(slot)
+
+    def run_one(test):
+        slot = slots.get()
+        try:
+            if solvers:
+                return slot.solve(
+                    test['perception_variant'],
+                    test['grid'],
+                    test['keymaker_pos'],
+                    test['expected_path_length'],
+                    timeout=timeout
+                )
+            return run_cpp_program(
+                algorithm,
+                test['perception_variant'],
+                test['grid'],
+                (0, 0),
+                test['keymaker_pos'],
+                test['expected_path_length'],
+                timeout=timeout,
+                cpu=slot
+            )
+        finally:
+            slots.put(slot)
+
+    mode = measurement_mode(bool(solvers), cpus, workers)
+
+    def cached(test):
+        key = cache.key(
+            CPLUSPLUS_PROGRAMS[algorithm],
+            map_to_input(test['perception_variant'], test['keymaker_pos'], test['grid']),
+            mode
+        )
+        hit = None if force else cache.get(key, timeout)
+        if hit is not None:
+            path_length, exec_time, usage, timed_out = hit
+            success = not timed_out and path_matches(path_length, test['expected_path_length'])
+            hit = (exec_time, success, path_length, usage)
+        return key, hit
+
+    def finish(item):
+        future, key = item
+        result = future.result()
+        exec_time, _, path_length, usage = result
+        # Ошибки запуска не кэшируются; тайм-аут сохраняется с флагом, чтобы не ждать его снова
+        if key is not None and exec_time is not None:
+            cache.put(key, path_length, exec_time, usage, timed_out=exec_time >= timeout)
+        return result
+
+    # Не больше 4 * workers тестов в очереди, чтобы большой корпус не загружался целиком
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for test in tests:
+                key, hit = cached(test) if cache is not None else (None, None)
+                if hit is not None:
+                    future = Future()
+                    future.set_result(hit)
+                    pending.append((future, None))
+                else:
+                    pending.append((pool.submit(run_one, test), key))
+                if len(pending) >= 4 * workers:
+                    yield finish(pending.popleft())
+            while pending:
+                yield finish(pending.popleft())
+    finally:
+        for solver in solvers:
+            solver.close()
+        if solvers:
+            cpu_time = sum(solver.cpu_time for solver in solvers)
+            print(f"Persistent solver: {cpu_time:.2f} seconds CPU time total (not reported per map)")
+        if cache is not None:
+            cache.commit()
+
+# Функция для тестирования и сбора данных с сохранением и загрузкой тестов
+def run_tests(algorithm, workers=1, pin_cpus=False, persistent=False, path='tests.txt', sample=None, shard=None,
+              cache=None, force=False):
+    times, successes, path_lengths, usages = [], [], [], []
+    tests, total = load_tests(path, sample, shard)
 
     # Демонстрация одного теста
-    example_test = tests[0]
+    example_test = next(tests)
     print("Example Test Case:")
     for row in example_test['grid']:
         print("".join(row))
     print(f"Keymaker Position: {example_test['keymaker_pos']}")
     print(f"Perception Variant: {example_test['perception_variant']}")
     
-    exec_time, success, path_length = run_cpp_program(
+    exec_time, success, path_length, usage = run_cpp_program(
         algorithm, 
         example_test['perception_variant'], 
         example_test['grid'], 
@@ -197,37 +545,29 @@ def run_tests(algorithm):
     )
     exec_time = exec_time if exec_time is not None else 0.0
     print(f"Execution Time: {exec_time:.4f} seconds")
+    if usage['user'] is not None:
+        print(f"CPU Time: {usage['user']:.4f} user, {usage['sys']:.4f} sys seconds")
+        print(f"Peak RSS: {usage['max_rss_kb']} KB")
     print(f"Success: {success}")
     print(f"Path Length: {path_length if path_length != -1 else 'Unreachable'}\n")
 
     # Запуск всех тестов
-    for idx, test in enumerate(tests[1:], start=2):
-        perception_variant = test['perception_variant']
-        grid = test['grid']
-        keymaker_pos = test['keymaker_pos']
-        expected_path_length = test['expected_path_length']
-        
-        exec_time, success, path_length = run_cpp_program(
-            algorithm, 
-            perception_variant, 
-            grid, 
-            (0, 0), 
-            keymaker_pos, 
-            expected_path_length
-        )
+    results = run_test_cases(algorithm, tests, workers, pin_cpus, persistent=persistent, cache=cache, force=force)
+    for idx, (exec_time, success, path_length, usage) in enumerate(results, start=2):
         if exec_time is not None:
             times.append(exec_time)
             successes.append(success)
+            usages.append(usage)
             if success:
                 path_lengths.append(path_length)
         
         if idx % 100 == 0:
-            print(f"Completed {idx} / {NUM_TESTS} tests.")
+            print(f"Completed {idx} / {total} tests.")
 
-    return times, successes, path_lengths
+    return times, successes, path_lengths, usages
 
 # Вычисление статы
-def calculate_statistics(times, successes, path_lengths):
+def calculate_statistics(times, successes, path_lengths, usages=None):
     stats_dict = {
         'Mean Execution Time': np.mean(times) if times else None,
         'Median Execution Time': np.median(times) if times else None,
@@ -244,21 +584,57 @@ def calculate_statistics(times, successes, path_lengths):
         stats_dict['Median Path Length'] = None
         stats_dict['Path Length Std Dev'] = None
 
+    # Стоимость: процессорное время (user + sys) и пиковая память, если они измерены
+    rss = [u['max_rss_kb'] for u in (usages or []) if u['max_rss_kb'] is not None]
+    usages = [u for u in (usages or []) if u['user'] is not None]
+    cpu_times = [u['user'] + u['sys'] for u in usages]
+    stats_dict['Mean CPU Time'] = np.mean(cpu_times) if cpu_times else None
+    stats_dict['Median CPU Time'] = np.median(cpu_times) if cpu_times else None
+    stats_dict['Mean User Time'] = np.mean([u['user'] for u in usages]) if usages else None
+    stats_dict['Mean System Time'] = np.mean([u['sys'] for u in usages]) if usages else None
+    stats_dict['Mean Peak RSS (KB)'] = np.mean(rss) if rss else None
+    stats_dict['Max Peak RSS (KB)'] = max(rss) if rss else None
+
     return stats_dict
 
 # Основная функция
 def main():
-    algorithm = input("Enter algorithm ('astar' or 'backtracking'): ").strip()
+    parser = argparse.ArgumentParser(description="Test harness for the A* and backtracking solvers")
+    parser.add_argument("algorithm", nargs="?", help="'astar', 'backtracking' or 'stub' (asked interactively if omitted)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of tests run at the same time (1 = serial timings; use --pin with more)")
+    parser.add_argument("--pin", action="store_true", help="pin every solver process to its own CPU (Linux)")
+    parser.add_argument("--persistent", action="store_true", help="keep one solver process per worker (batch protocol)")
+    parser.add_argument("--tests", default="tests.txt", help="tests.txt (JSON) or a binary corpus (.bin, see corpus.py)")
+    parser.add_argument("--sample", type=int, default=None, help="run a random sample of N tests")
+    parser.add_argument("--shard", default=None, help="run shard I/N of the tests, e.g. 0/4")
+    parser.add_argument("--cache", default="results.db", help="result cache keyed by solver binary and map (SQLite)")
+    parser.add_argument("--no-cache", action="store_true", help="run every map and do not touch the cache")
+    parser.add_argument("--force", action="store_true", help="re-measure every map and overwrite cached results")
+    args = parser.parse_args()
+    shard = tuple(int(part) for part in args.shard.split("/")) if args.shard else None
+
+    algorithm = args.algorithm or input("Enter algorithm ('astar' or 'backtracking'): ").strip()
 
     if algorithm not in CPLUSPLUS_PROGRAMS:
         print("Invalid algorithm selected.")
         return
 
-    times, successes, path_lengths = run_tests(algorithm)
+    cache = None if args.no_cache else ResultCache(args.cache)
+    try:
+        times, successes, path_lengths, usages = run_tests(
+            algorithm, args.workers, args.pin, args.persistent, args.tests, args.sample, shard,
+            cache=cache, force=args.force
+        )
+    finally:
+        if cache is not None:
+            cache.close()
+    if cache is not None:
+        print(f"Result cache: {cache.hits} reused, {cache.stored} measured ({args.cache})")
     
     # Вывод статистики
     print(f"\n{algorithm.upper()} Algorithm Statistics:")
-    stats_result = calculate_statistics(times, successes, path_lengths)
+    stats_result = calculate_statistics(times, successes, path_lengths, usages)
     for key, value in stats_result.items():
         if isinstance(value, float):
             print(f"{key}: {value:.6f}")
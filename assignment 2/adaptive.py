@@ -0,0 +1,92 @@
+import csv
+
+
+def diversity(population):
+    """Share of distinct individuals in the population (1.0 = all different)."""
+    return len({ind for ind, _, _ in population}) / len(population)
+
+
+class AdaptiveControl:
+    """
+    Online control of the GA parameters, used instead of the hand-tuned constants.
+    Every generation it looks at population diversity and the stagnation counter:
+      - low diversity: raise mutation_chance and shrink the elite (explore more),
+      - high diversity while improving: lower mutation_chance and grow the elite (exploit),
+      - long stagnation: raise mutation_chance,
+      - restart when stagnation reaches max_stagnation scaled by diversity, so a diverse
+        population gets more patience and a collapsed one restarts sooner.
+    Every decision is appended to `log`, one dict per generation.
+    """
+
+    def __init__(
+        self,
+        mutation_chance=0.92,
+        elitism_count=600,
+        max_stagnation=50,
+        population_size=2500,
+        target_diversity=0.5,
+        mutation_bounds=(0.5, 1.0),
+        elite_bounds=(0.05, 0.4),
+        step=0.05,
+        verbose=False,
+    ):
+        self.mutation_chance = mutation_chance
+        self.elitism_count = elitism_count
+        self.max_stagnation = max_stagnation
+        self.population_size = population_size
+        self.target_diversity = target_diversity
+        self.mutation_bounds = mutation_bounds
+        self.elite_bounds = (
+            max(2, int(elite_bounds[0] * population_size)),
+            max(2, int(elite_bounds[1] * population_size)),
+        )
+        self.step = step
+        self.verbose = verbose
+        self.log = []
+
+    def update(self, generation, population, best_fitness, stagnation_counter):
+        """Returns (mutation_chance, elitism_count, restart) for this generation."""
+        div = diversity(population)
+        scale = 1 + self.step
+        if div < self.target_diversity:
+            self.mutation_chance *= scale
+            self.elitism_count = int(self.elitism_count / scale)
+        elif stagnation_counter == 0:
+            self.mutation_chance /= scale
+            self.elitism_count = int(self.elitism_count * scale) + 1
+        if stagnation_counter > self.max_stagnation // 2:
+            self.mutation_chance *= scale
+
+        low, high = self.mutation_bounds
+        self.mutation_chance = min(high, max(low, self.mutation_chance))
+        low, high = self.elite_bounds
+        self.elitism_count = min(high, max(low, self.elitism_count))
+
+        patience = self.max_stagnation * (0.5 + div)
+        restart = stagnation_counter >= patience
+
+        self.log.append(
+            {
+                "generation": generation,
+                "best_fitness": best_fitness,
+                "diversity": round(div, 4),
+                "stagnation": stagnation_counter,
+                "mutation_chance": round(self.mutation_chance, 4),
+                "elitism_count": self.elitism_count,
+                "restart": restart,
+            }
+        )
+        if self.verbose:
+            print(
+                f"Generation {generation}: diversity {div:.3f}, mutation {self.mutation_chance:.3f}, "
+                f"elitism {self.elitism_count}, patience {patience:.0f}"
+            )
+        return self.mutation_chance, self.elitism_count, restart
+
+    def write_log(self, filename):
+        if not self.log:
+            return
+        with open(filename, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(self.log[0]))
+            writer.writeheader()
+            writer.writerows(self.log)
@@ -0,0 +1,192 @@
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import main
+
+EMPTY_CHARS = "0.-_"
+# Cell characters of the larger boards: 1-9 then A, B, ... (16x16 uses 1-G, 25x25 uses 1-P)
+SYMBOLS = "123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+LINE_LENGTHS = {side * side: side for side in (4, 9, 16, 25)}
+
+
+def parse_puzzle_line(line):
+    """
+    Parses one puzzle in the compact format: 81 characters, row by row
+    (16, 256 and 625 for the 4x4, 16x16 and 25x25 boards, letters for the digits above 9).
+    Digits are givens, any of '0', '.', '-', '_' is an empty cell.
+    """
+    line = line.strip()
+    if len(line) not in LINE_LENGTHS:
+        raise ValueError(f"Puzzle line must contain 81 characters (16, 256 or 625 for 4x4, 16x16, 25x25), got {len(line)}")
+    size = LINE_LENGTHS[len(line)]
+    cells = []
+    for ch in line:
+        if ch in EMPTY_CHARS:
+            cells.append(0)
+        elif ch.upper() in SYMBOLS[:size]:
+            cells.append(SYMBOLS.index(ch.upper()) + 1)
+        else:
+            raise ValueError(f"Invalid cell character: {ch!r}")
+    return [cells[size * i : size * i + size] for i in range(size)]
+
+
+def format_puzzle_line(grid):
+    return "".join(SYMBOLS[val - 1] if val else "0" for row in grid for val in row)
+
+
+def iter_puzzles(stream, errors="raise"):
+    """
+    Yields puzzles from a stream, one per line. Blank lines and '#' comments are skipped.
+    errors="yield" yields the ValueError of a malformed line in its place instead of raising.
+    """
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            try:
+                yield parse_puzzle_line(line)
+            except ValueError as exc:
+                if errors != "yield":
+                    raise
+                yield exc
+
+
+def solve_one(puzzle, engine, solver_kwargs):
+    """Runs in a worker process. Returns (solution, fitness, seconds)."""
+    fixed_cells = [[cell != 0 for cell in row] for row in puzzle]
+    start = time.perf_counter()
+    solution = main.get_solver(engine)(puzzle, fixed_cells, verbose=False, **solver_kwargs)
+    elapsed = time.perf_counter() - start
+    return solution, main.fitness(solution), elapsed
+
+
+def failed(exc):
+    """An already completed Future holding exc, queued like a submitted puzzle."""
+    future = Future()
+    future.set_exception(exc)
+    return future
+
+
+def outcome(index, future):
+    """(index, solution, fitness, seconds), or (index, None, None, error message) if it failed."""
+    try:
+        return (index, *future.result())
+    except Exception as exc:
+        return index, None, None, f"{type(exc).__name__}: {exc}"
+
+
+def read_ahead(puzzles, events, slots):
+    """Reader thread of solve_stream: queues ("puzzle", index, puzzle) for every input item, one per free slot."""
+    try:
+        for index, puzzle in enumerate(puzzles):
+            slots.acquire()
+            events.put(("puzzle", index, puzzle))
+    except Exception as exc:
+        events.put(("error", exc))
+    events.put(("end",))
+
+
+def solve_stream(puzzles, workers=None, engine="ga", **solver_kwargs):
+    """
+    Solves puzzles concurrently on a process pool and yields
+    (index, solution, fitness, seconds) in input order as soon as each result is ready.
+    At most 2 * workers puzzles are in flight, so the input can be an unbounded stream.
+    The input is read on a separate thread, so a finished result is yielded right away
+    even while the next line (e.g. from stdin) has not arrived yet.
+    An exception in place of a puzzle (see iter_puzzles(..., errors="yield")) or a failed
+    solve yields (index, None, None, error message) and the stream goes on.
+    """
+    workers = workers or os.cpu_count() or 1
+    # Input items and finished solves arrive on one queue, so the loop wakes up on either
+    events = queue.Queue()
+    slots = threading.Semaphore(2 * workers)
+    pending = deque()
+    reading = True
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Workers are forked on the first submit; forking while the reader thread holds the
+        # stdin lock would deadlock the children, so they are started before the reader
+        pool.submit(int).result()
+        threading.Thread(target=read_ahead, args=(puzzles, events, slots), daemon=True).start()
+        while reading or pending:
+            while pending and pending[0][1].done():
+                yield outcome(*pending.popleft())
+                slots.release()
+            if not reading and not pending:
+                break
+            event = events.get()
+            if event[0] == "end":
+                reading = False
+            elif event[0] == "error":
+                raise event[1]
+            elif event[0] == "puzzle":
+                _, index, puzzle = event
+                if isinstance(puzzle, Exception):
+                    future = failed(puzzle)
+                else:
+                    future = pool.submit(solve_one, puzzle, engine, solver_kwargs)
+                    future.add_done_callback(lambda _: events.put(("done",)))
+                pending.append((index, future))
+
+
+def main_batch(argv=None):
+    parser = argparse.ArgumentParser(description="Solve many Sudoku puzzles, one 81-character line each.")
+    parser.add_argument("input", nargs="?", default="-", help="puzzle file, '-' for stdin")
+    parser.add_argument("-o", "--output", default="-", help="result file, '-' for stdout")
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument("--engine", choices=[name for name in main.SOLVERS if name != "islands"], default="ga")
+    parser.add_argument("--population-size", type=int, default=2500)
+    parser.add_argument("--generations", type=int, default=15000)
+    parser.add_argument("--elitism-count", type=int, default=600)
+    parser.add_argument("--mutation-chance", type=float, default=0.92)
+    parser.add_argument("--max-stagnation", type=int, default=50)
+    parser.add_argument("--presolve", action="store_true", help="constraint propagation before the GA")
+    parser.add_argument("--time-budget", type=float, default=None, help="seconds per puzzle; best individual so far on timeout")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == "-" else open(args.input, "r")
+    target = sys.stdout if args.output == "-" else open(args.output, "w")
+    solved = total = errors = 0
+    start = time.perf_counter()
+    solver_kwargs = {}
+    if args.engine != "exact":
+        solver_kwargs = dict(
+            population_size=args.population_size,
+            generations=args.generations,
+            elitism_count=args.elitism_count,
+            mutation_chance=args.mutation_chance,
+            max_stagnation=args.max_stagnation,
+            presolve=args.presolve,
+            time_budget=args.time_budget,
+        )
+    try:
+        results = solve_stream(
+            iter_puzzles(source, errors="yield"), workers=args.workers, engine=args.engine, **solver_kwargs
+        )
+        # One line per puzzle: index, solution, fitness (0 = solved), solve time in seconds,
+        # or index ERROR message for a malformed line or a failed solve
+        for index, solution, score, elapsed in results:
+            total += 1
+            if solution is None:
+                target.write(f"{index} ERROR {elapsed}\n")
+                errors += 1
+            else:
+                target.write(f"{index} {format_puzzle_line(solution)} {score} {elapsed:.4f}\n")
+                solved += score == 0
+            target.flush()
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+    print(
+        f"Solved {solved} / {total} puzzles ({errors} errors) in {time.perf_counter() - start:.2f} s", file=sys.stderr
+    )
+
+
+if __name__ == "__main__":
+    main_batch()
@@ -0,0 +1,316 @@
+import argparse
+import random
+import statistics
+import time
+import tracemalloc
+
+from exact import SearchLimitExceeded, count_solutions, solve_exact
+from generator import load_corpus
+from main import fitness, genetic_algorithm, initial_population, solve_anytime
+from plot import generate_sudoku
+from profiling import GAProfiler, NullSink
+
+DIFFICULTIES = ["easy", "medium", "hard", "very_hard"]
+
+
+def benchmark_puzzles(difficulty, count, corpus=None):
+    """`count` puzzles of a difficulty: from a generator corpus if given, else generate_sudoku()."""
+    if corpus is not None:
+        return corpus[difficulty][:count]
+    return [generate_sudoku(difficulty) for _ in range(count)]
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def bench_solvers(puzzles_per_difficulty=5, seed=0, corpus=None, **ga_kwargs):
+    """
+    Latency of the exact solver against the GA on puzzles from generate_sudoku()
+    (or from a generator corpus, see generator.load_corpus).
+    Returns {difficulty: {"exact": [...], "ga": [...], "ga_solved": int, "unique": int}}.
+    """
+    random.seed(seed)
+    results = {}
+    for difficulty in DIFFICULTIES:
+        row = {"exact": [], "ga": [], "ga_solved": 0, "unique": 0}
+        for puzzle in benchmark_puzzles(difficulty, puzzles_per_difficulty, corpus):
+            fixed_cells = [[cell != 0 for cell in r] for r in puzzle]
+            _, exact_time = timed(solve_exact, puzzle)
+            solution, ga_time = timed(genetic_algorithm, puzzle, fixed_cells, verbose=False, **ga_kwargs)
+            row["exact"].append(exact_time)
+            row["ga"].append(ga_time)
+            row["ga_solved"] += fitness(solution) == 0
+            row["unique"] += count_solutions(puzzle) == 1
+        results[difficulty] = row
+    return results
+
+
+def print_solver_table(results, puzzles_per_difficulty):
+    print(f"{'difficulty':<10} {'unique':>7} {'exact ms':>10} {'ga ms':>10} {'ga solved':>10}")
+    for difficulty, row in results.items():
+        print(
+            f"{difficulty:<10} {row['unique']:>4}/{puzzles_per_difficulty:<2}"
+            f" {statistics.median(row['exact']) * 1000:>10.2f}"
+            f" {statistics.median(row['ga']) * 1000:>10.1f}"
+            f" {row['ga_solved']:>7}/{puzzles_per_difficulty:<2}"
+        )
+
+
+def bench_memetic(puzzles_per_difficulty=3, seed=0, difficulties=("hard", "very_hard"), corpus=None, **ga_kwargs):
+    """
+    Generations-to-solve and wall time of the plain GA against memetic mode,
+    both runs of a puzzle start from the same random seed.
+    Returns {difficulty: {mode: [(generations, seconds, solved), ...]}}.
+    """
+    random.seed(seed)
+    puzzles = {d: benchmark_puzzles(d, puzzles_per_difficulty, corpus) for d in difficulties}
+    results = {}
+    for difficulty, batch in puzzles.items():
+        results[difficulty] = {"plain": [], "memetic": []}
+        for k, puzzle in enumerate(batch):
+            fixed_cells = [[cell != 0 for cell in r] for r in puzzle]
+            for mode in ("plain", "memetic"):
+                random.seed(seed + k)
+                history = []
+                solution, elapsed = timed(
+                    genetic_algorithm,
+                    puzzle,
+                    fixed_cells,
+                    verbose=False,
+                    memetic=mode == "memetic",
+                    history=history,
+                    **ga_kwargs,
+                )
+                results[difficulty][mode].append((len(history), elapsed, fitness(solution) == 0))
+    return results
+
+
+def print_mode_table(results):
+    print(f"{'difficulty':<10} {'mode':<10} {'solved':>7} {'median gens':>12} {'median s':>9}")
+    for difficulty, modes in results.items():
+        for mode, runs in modes.items():
+            solved = sum(run[2] for run in runs)
+            print(
+                f"{difficulty:<10} {mode:<10} {solved:>4}/{len(runs):<2}"
+                f" {statistics.median(run[0] for run in runs):>12.0f}"
+                f" {statistics.median(run[1] for run in runs):>9.2f}"
+            )
+
+
+def bench_selection(
+    puzzles_per_difficulty=3, seed=0, difficulties=("medium", "hard"), corpus=None,
+    strategies=(None, "tournament", "rank", "sus"), **ga_kwargs
+):
+    """
+    Per-generation cost and convergence of the selection strategies against the original
+    truncation scheme (None, full sorts). Every strategy starts a puzzle from the same seed.
+    The sort and parent selection phases are timed with a GAProfiler.
+    Returns {difficulty: {name: [(generations, seconds, solved, best fitness, sort + select seconds), ...]}}.
+    """
+    random.seed(seed)
+    puzzles = {d: benchmark_puzzles(d, puzzles_per_difficulty, corpus) for d in difficulties}
+    results = {}
+    for difficulty, batch in puzzles.items():
+        results[difficulty] = {strategy or "sorted": [] for strategy in strategies}
+        for k, puzzle in enumerate(batch):
+            fixed_cells = [[cell != 0 for cell in r] for r in puzzle]
+            for strategy in strategies:
+                random.seed(seed + k)
+                history = []
+                profiler = GAProfiler(NullSink())
+                solution, elapsed = timed(
+                    genetic_algorithm, puzzle, fixed_cells, verbose=False, selection=strategy, history=history,
+                    profiler=profiler, **ga_kwargs
+                )
+                results[difficulty][strategy or "sorted"].append(
+                    (len(history), elapsed, fitness(solution) == 0, min(history),
+                     profiler.totals["sort"] + profiler.totals["select"])
+                )
+    return results
+
+
+def print_selection_table(results):
+    print(
+        f"{'difficulty':<10} {'selection':<11} {'solved':>7} {'median gens':>12} {'ms/gen':>8}"
+        f" {'select ms':>10} {'best fit':>9}"
+    )
+    for difficulty, strategies in results.items():
+        for name, runs in strategies.items():
+            solved = sum(run[2] for run in runs)
+            per_gen = statistics.median(run[1] / run[0] * 1000 for run in runs)
+            select = statistics.median(run[4] / run[0] * 1000 for run in runs)
+            print(
+                f"{difficulty:<10} {name:<11} {solved:>4}/{len(runs):<2}"
+                f" {statistics.median(run[0] for run in runs):>12.0f}"
+                f" {per_gen:>8.2f}"
+                f" {select:>10.2f}"
+                f" {statistics.median(run[3] for run in runs):>9.1f}"
+            )
+
+
+def population_memory(puzzle, fixed_cells, population_size):
+    """Peak bytes allocated while building and scoring one population (tracemalloc)."""
+    tracemalloc.start()
+    population = initial_population(puzzle, fixed_cells, population_size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del population
+    return peak
+
+
+def bench_board_sizes(
+    bases=(3, 4, 5), puzzles_per_size=3, seed=0, difficulty="medium", time_budget=60.0,
+    exact_node_limit=200000, presolve_modes=(False, True), **ga_kwargs
+):
+    """
+    Time-to-solve and memory of the GA per board size (base x base blocks: 3 -> 9x9,
+    4 -> 16x16, 5 -> 25x25) on generate_sudoku() puzzles with the same share of blanks,
+    once per presolve mode. Every run is cut off at time_budget seconds (see main.solve_anytime);
+    the exact solver is timed on the same puzzles, None when it gives up after exact_node_limit nodes.
+    Returns {(base, presolve): {"runs": [(solved, seconds, generations, fitness), ...],
+                                "exact": [seconds or None, ...], "memory": bytes, "population_size": int}}.
+    """
+    population_size = ga_kwargs.get("population_size", 2500)
+    results = {}
+    for base in bases:
+        random.seed(seed)
+        puzzles = [generate_sudoku(difficulty, base) for _ in range(puzzles_per_size)]
+        exact = []
+        for puzzle in puzzles:
+            try:
+                _, exact_time = timed(solve_exact, puzzle, 1, exact_node_limit)
+            except SearchLimitExceeded:
+                exact_time = None
+            exact.append(exact_time)
+        random.seed(seed)
+        first_fixed = [[cell != 0 for cell in r] for r in puzzles[0]]
+        memory = population_memory(puzzles[0], first_fixed, population_size)
+        for presolve in presolve_modes:
+            row = {"runs": [], "exact": exact, "memory": memory, "population_size": population_size}
+            for k, puzzle in enumerate(puzzles):
+                fixed_cells = [[cell != 0 for cell in r] for r in puzzle]
+                random.seed(seed + k)
+                run = solve_anytime(puzzle, fixed_cells, time_budget=time_budget, presolve=presolve, **ga_kwargs)
+                row["runs"].append((run["stopped"] == "solved", run["seconds"], run["generations"], run["fitness"]))
+            results[base, presolve] = row
+    return results
+
+
+def print_size_table(results):
+    print(
+        f"{'board':<7} {'presolve':<8} {'solved':>7} {'median s':>9} {'median gens':>12} {'ms/gen':>8} {'best fit':>9}"
+        f" {'pop MB':>8} {'B/indiv':>8} {'exact ms':>9}"
+    )
+    for (base, presolve), row in results.items():
+        side = base * base
+        runs = row["runs"]
+        solved = sum(run[0] for run in runs)
+        per_gen = statistics.median(run[1] / max(run[2], 1) * 1000 for run in runs)
+        exact = [t for t in row["exact"] if t is not None]
+        exact_ms = f"{statistics.median(exact) * 1000:>9.1f}" if exact else f"{'gave up':>9}"
+        print(
+            f"{f'{side}x{side}':<7} {'yes' if presolve else 'no':<8} {solved:>4}/{len(runs):<2}"
+            f" {statistics.median(run[1] for run in runs):>9.2f}"
+            f" {statistics.median(run[2] for run in runs):>12.0f}"
+            f" {per_gen:>8.2f}"
+            f" {statistics.median(run[3] for run in runs):>9.1f}"
+            f" {row['memory'] / 2**20:>8.1f}"
+            f" {row['memory'] / row['population_size']:>8.0f}"
+            f" {exact_ms}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sudoku solver benchmarks")
+    sub = parser.add_subparsers(dest="benchmark", required=True)
+
+    solvers = sub.add_parser("solvers", help="exact solver vs GA latency (median per difficulty)")
+    solvers.add_argument("--puzzles", type=int, default=5)
+    solvers.add_argument("--seed", type=int, default=0)
+    solvers.add_argument("--population-size", type=int, default=2500)
+    solvers.add_argument("--elitism-count", type=int, default=600)
+    solvers.add_argument("--generations", type=int, default=15000)
+    solvers.add_argument("--corpus", default=None, help="seeded puzzle corpus from generator.py (created if missing)")
+
+    memetic = sub.add_parser("memetic", help="plain GA vs memetic mode: generations and wall time")
+    memetic.add_argument("--puzzles", type=int, default=3)
+    memetic.add_argument("--seed", type=int, default=0)
+    memetic.add_argument("--population-size", type=int, default=2500)
+    memetic.add_argument("--elitism-count", type=int, default=600)
+    memetic.add_argument("--generations", type=int, default=15000)
+    memetic.add_argument("--corpus", default=None, help="seeded puzzle corpus from generator.py (created if missing)")
+    memetic.add_argument("--presolve", action="store_true")
+
+    selection = sub.add_parser("selection", help="selection strategies vs truncation: ms per generation and convergence")
+    selection.add_argument("--puzzles", type=int, default=3)
+    selection.add_argument("--seed", type=int, default=0)
+    selection.add_argument("--population-size", type=int, default=2500)
+    selection.add_argument("--elitism-count", type=int, default=600)
+    selection.add_argument("--generations", type=int, default=300)
+    selection.add_argument("--corpus", default=None, help="seeded puzzle corpus from generator.py (created if missing)")
+
+    sizes = sub.add_parser("sizes", help="time-to-solve and memory per board size (9x9, 16x16, 25x25)")
+    sizes.add_argument("--block-sizes", type=int, nargs="+", default=[3, 4, 5])
+    sizes.add_argument("--puzzles", type=int, default=3)
+    sizes.add_argument("--seed", type=int, default=0)
+    sizes.add_argument("--difficulty", choices=DIFFICULTIES, default="medium")
+    sizes.add_argument("--time-budget", type=float, default=60.0, help="seconds per GA run")
+    sizes.add_argument("--population-size", type=int, default=2500)
+    sizes.add_argument("--elitism-count", type=int, default=600)
+    sizes.add_argument("--presolve", choices=["off", "on", "both"], default="both",
+                       help="run the GA without and/or with constraint propagation")
+    sizes.add_argument("--memetic", action="store_true")
+
+    args = parser.parse_args()
+    corpus = load_corpus(args.corpus, args.puzzles, args.seed) if getattr(args, "corpus", None) else None
+    if args.benchmark == "solvers":
+        results = bench_solvers(
+            args.puzzles,
+            args.seed,
+            corpus,
+            population_size=args.population_size,
+            elitism_count=args.elitism_count,
+            generations=args.generations,
+        )
+        print_solver_table(results, args.puzzles)
+    elif args.benchmark == "memetic":
+        results = bench_memetic(
+            args.puzzles,
+            args.seed,
+            corpus=corpus,
+            population_size=args.population_size,
+            elitism_count=args.elitism_count,
+            generations=args.generations,
+            presolve=args.presolve,
+        )
+        print_mode_table(results)
+    elif args.benchmark == "selection":
+        results = bench_selection(
+            args.puzzles,
+            args.seed,
+            corpus=corpus,
+            population_size=args.population_size,
+            elitism_count=args.elitism_count,
+            generations=args.generations,
+        )
+        print_selection_table(results)
+    elif args.benchmark == "sizes":
+        results = bench_board_sizes(
+            args.block_sizes,
+            args.puzzles,
+            args.seed,
+            args.difficulty,
+            args.time_budget,
+            population_size=args.population_size,
+            elitism_count=args.elitism_count,
+            presolve_modes={"off": (False,), "on": (True,), "both": (False, True)}[args.presolve],
+            memetic=args.memetic,
+        )
+        print_size_table(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+from functools import lru_cache
+from math import isqrt
+
+ALL_DIGITS = 0b1111111110  # bits 1..9
+POPCOUNT = [bin(m).count("1") for m in range(1 << 10)]
+BLOCK_OF = [[3 * (r // 3) + c // 3 for c in range(9)] for r in range(9)]
+
+
+class SearchLimitExceeded(Exception):
+    """solve_exact gave up after node_limit search nodes."""
+
+
+@lru_cache(maxsize=None)
+def board_tables(n):
+    """(all digits mask, popcount function, block index of every cell) for an n x n board."""
+    if n == 9:
+        return ALL_DIGITS, POPCOUNT.__getitem__, BLOCK_OF
+    base = isqrt(n)
+    if base * base != n:
+        raise ValueError(f"Board size must be a perfect square, got {n}")
+    block_of = [[base * (r // base) + c // base for c in range(n)] for r in range(n)]
+    popcount = POPCOUNT.__getitem__ if n < 9 else lambda mask: bin(mask).count("1")
+    return ((1 << n) - 1) << 1, popcount, block_of
+
+
+def solve_exact(puzzle, limit=1, node_limit=None):
+    """
+    Deterministic bitmask backtracking with MRV ordering (always branch on the
+    empty cell with the fewest candidates).
+    Returns a list with up to `limit` solutions, empty if the puzzle has none.
+    With node_limit, raises SearchLimitExceeded after that many search nodes
+    (sparse 16x16 and 25x25 boards can take minutes to prove unique).
+    """
+    n = len(puzzle)
+    all_digits, popcount, block_of = board_tables(n)
+    grid = [row[:] for row in puzzle]
+    rows, cols, blocks = [0] * n, [0] * n, [0] * n
+    empties = []
+    for r in range(n):
+        for c in range(n):
+            val = grid[r][c]
+            if val == 0:
+                empties.append((r, c, block_of[r][c]))
+                continue
+            bit = 1 << val
+            b = block_of[r][c]
+            if (rows[r] | cols[c] | blocks[b]) & bit:
+                return []  # givens already conflict
+            rows[r] |= bit
+            cols[c] |= bit
+            blocks[b] |= bit
+
+    solutions = []
+    nodes = 0
+
+    def search(k):
+        nonlocal nodes
+        if node_limit is not None:
+            nodes += 1
+            if nodes > node_limit:
+                raise SearchLimitExceeded(f"no result after {node_limit} nodes")
+        if k == len(empties):
+            solutions.append([row[:] for row in grid])
+            return len(solutions) >= limit
+
+        # MRV: move the most constrained remaining cell to position k
+        best, best_count, best_mask = k, n + 1, 0
+        for i in range(k, len(empties)):
+            r, c, b = empties[i]
+            mask = all_digits & ~(rows[r] | cols[c] | blocks[b])
+            count = popcount(mask)
+            if count < best_count:
+                best, best_count, best_mask = i, count, mask
+                if count <= 1:
+                    break
+        if best_count == 0:
+            return False
+        empties[k], empties[best] = empties[best], empties[k]
+        r, c, b = empties[k]
+
+        mask = best_mask
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            grid[r][c] = bit.bit_length() - 1
+            rows[r] |= bit
+            cols[c] |= bit
+            blocks[b] |= bit
+            done = search(k + 1)
+            rows[r] ^= bit
+            cols[c] ^= bit
+            blocks[b] ^= bit
+            if done:
+                return True
+        grid[r][c] = 0
+        return False
+
+    search(0)
+    return solutions
+
+
+def count_solutions(puzzle, limit=2, node_limit=None):
+    """Number of solutions, counting stops at `limit`."""
+    return len(solve_exact(puzzle, limit, node_limit))
+
+
+def is_unique(puzzle, node_limit=None):
+    return count_solutions(puzzle, 2, node_limit) == 1
+
+
+def exact_algorithm(puzzle, fixed_cells=None, verbose=True):
+    """
+    Same call shape and return value as genetic_algorithm, for the solver flag.
+    fixed_cells is implied by the puzzle and only accepted for compatibility.
+    """
+    solutions = solve_exact(puzzle)
+    if not solutions:
+        if verbose:
+            print("No solution found.")
+        return [row[:] for row in puzzle]
+    return solutions[0]
@@ -0,0 +1,165 @@
+import argparse
+import glob
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from plot import generate_sudoku, genetic_algorithm
+
+DIFFICULTIES = ("easy", "medium", "hard", "very_hard")
+COLORS = {"easy": "blue", "medium": "orange", "hard": "green", "very_hard": "red"}
+
+
+class HistoryWriter:
+    """
+    Append-only JSONL stream of one run: a "start" record, one record per generation
+    and an "end" record. Every line is flushed, so a reader sees a running experiment.
+    """
+
+    def __init__(self, f, run_id, flush_every=1):
+        self.f = f
+        self.run_id = run_id
+        self.flush_every = flush_every
+        self.generation = 0
+
+    def write(self, record):
+        self.f.write(json.dumps({"run": self.run_id, **record}) + "\n")
+
+    def append(self, fitness):
+        self.generation += 1
+        self.write({"g": self.generation, "f": fitness})
+        if self.generation % self.flush_every == 0:
+            self.f.flush()
+
+
+def run_id(difficulty, seed):
+    return f"{difficulty}-{seed}"
+
+
+def run_experiment(store, difficulty, seed, flush_every=1, **ga_kwargs):
+    """One GA run in a worker. Each worker process appends to its own shard file."""
+    random.seed(seed)
+    puzzle = generate_sudoku(difficulty)
+    fixed_cells = [[cell != 0 for cell in row] for row in puzzle]
+    shard = os.path.join(store, f"shard-{os.getpid()}.jsonl")
+    with open(shard, "a") as f:
+        writer = HistoryWriter(f, run_id(difficulty, seed), flush_every)
+        writer.write({"event": "start", "difficulty": difficulty, "seed": seed, "params": ga_kwargs})
+        start = time.perf_counter()
+        genetic_algorithm(puzzle, fixed_cells, fitness_history=writer, **ga_kwargs)
+        seconds = time.perf_counter() - start
+        writer.write({"event": "end", "generations": writer.generation, "seconds": seconds})
+    return difficulty, seed, seconds
+
+
+def read_store(store):
+    """
+    {run_id: {"difficulty", "seed", "history": [...], "done": bool}} from all shards.
+    A half-written last line (the run is still going) is skipped.
+    """
+    runs = {}
+    for path in sorted(glob.glob(os.path.join(store, "shard-*.jsonl"))):
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                event = record.get("event")
+                if event == "start":
+                    # A restarted run (after an interruption) starts its history again
+                    runs[record["run"]] = {
+                        "difficulty": record["difficulty"], "seed": record["seed"], "history": [], "done": False
+                    }
+                elif record["run"] in runs:
+                    if event == "end":
+                        runs[record["run"]]["done"] = True
+                    else:
+                        runs[record["run"]]["history"].append(record["f"])
+    return runs
+
+
+def run_all(store, difficulties=DIFFICULTIES, seeds=range(8), workers=None, **ga_kwargs):
+    """Fans (difficulty, seed) runs over a process pool, skipping runs already finished in the store."""
+    os.makedirs(store, exist_ok=True)
+    finished = {key for key, run in read_store(store).items() if run["done"]}
+    jobs = [(d, s) for d in difficulties for s in seeds if run_id(d, s) not in finished]
+    print(f"{len(jobs)} runs to go, {len(finished)} already in {store}")
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        futures = [pool.submit(run_experiment, store, d, s, **ga_kwargs) for d, s in jobs]
+        for done, future in enumerate(as_completed(futures), start=1):
+            difficulty, seed, seconds = future.result()
+            print(f"[{done}/{len(jobs)}] {difficulty} seed {seed}: {seconds:.2f} s")
+
+
+def average_curves(runs, include_partial=False):
+    """
+    Mean best fitness per generation and difficulty. A finished run keeps its last
+    value after it stops (0 once solved), a run in progress counts only up to where it is.
+    """
+    curves = {}
+    for difficulty in DIFFICULTIES:
+        histories = [
+            (run["history"], run["done"]) for run in runs.values()
+            if run["difficulty"] == difficulty and run["history"] and (run["done"] or include_partial)
+        ]
+        if not histories:
+            continue
+        length = max(len(history) for history, _ in histories)
+        curve = []
+        for g in range(length):
+            values = [
+                history[g] if g < len(history) else history[-1]
+                for history, done in histories if g < len(history) or done
+            ]
+            curve.append(sum(values) / len(values))
+        curves[difficulty] = (curve, len(histories))
+    return curves
+
+
+def plot_store(store, out, include_partial=False):
+    """Headless plot of the averaged curves; matplotlib is only needed for this step."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    curves = average_curves(read_store(store), include_partial)
+    plt.figure(figsize=(10, 6))
+    for difficulty, (curve, count) in curves.items():
+        plt.plot(curve, label=f"{difficulty.capitalize()} ({count} runs)", color=COLORS[difficulty])
+    plt.title("avg Fitness vs generation")
+    plt.xlabel("Generation")
+    plt.ylabel("avg Fitness")
+    plt.legend()
+    plt.grid(True)
+    plt.savefig(out)
+    print(f"Saved {out}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel fitness-curve experiments for plot.py")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="run (difficulty, seed) experiments and stream histories to the store")
+    run.add_argument("--store", default="experiments")
+    run.add_argument("--difficulties", nargs="+", default=list(DIFFICULTIES), choices=DIFFICULTIES)
+    run.add_argument("--seeds", type=int, default=8, help="runs per difficulty")
+    run.add_argument("--workers", type=int, default=None)
+    run.add_argument("--population-size", type=int, default=300)
+    run.add_argument("--generations", type=int, default=500)
+    plot = sub.add_parser("plot", help="plot averaged curves from the store (works while runs are going)")
+    plot.add_argument("--store", default="experiments")
+    plot.add_argument("--out", default="fitness.png")
+    plot.add_argument("--partial", action="store_true", help="include runs that are still going")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        run_all(args.store, args.difficulties, range(args.seeds), args.workers,
+                population_size=args.population_size, generations=args.generations)
+    else:
+        plot_store(args.store, args.out, args.partial)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+from collections import OrderedDict
+
+DUPLICATE_POLICIES = (None, "reject", "remutate")
+
+
+class FitnessCache:
+    """
+    Bounded LRU cache of scored individuals: hash(individual) -> (individual, fitness, counts).
+    The stored individual is compared on a hit, so a hash collision is a miss, not a wrong score.
+    Counts are shared with the population: entries' counts are never changed in place.
+    Also keeps the statistics of the cached generation step (see main.next_generation):
+    hits, misses, rejected and re-mutated duplicates, and the diversity of every generation.
+    """
+
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+        self.remutated = 0
+        self.diversity = []
+
+    def get(self, individual):
+        """(fitness, counts) of a cached individual, or None."""
+        key = hash(individual)
+        entry = self.entries.get(key)
+        if entry is None or entry[0] != individual:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1], entry[2]
+
+    def put(self, individual, fitness, counts):
+        self.entries[hash(individual)] = (individual, fitness, counts)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def summary(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate(),
+            "rejected": self.rejected,
+            "remutated": self.remutated,
+            "diversity": self.diversity[-1] if self.diversity else None,
+            "mean_diversity": sum(self.diversity) / len(self.diversity) if self.diversity else None,
+        }
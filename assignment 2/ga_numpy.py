@@ -0,0 +1,222 @@
+import time
+
+import numpy as np
+
+from main import read_puzzle, stop_reason
+from propagation import propagate
+
+# Number of distinct digits in a 9-bit mask (bits 1..9 are used, so 1024 entries)
+POPCOUNT = np.array([bin(m).count("1") for m in range(1 << 10)], dtype=np.uint8)
+
+
+def fitness_batch(population):
+    """
+    Fitness of a whole population stored as a (P, 9, 9) uint8 array.
+    Same score as main.fitness: sum of (9 - distinct digits) over rows, columns and blocks.
+    """
+    size = population.shape[0]
+    masks = np.left_shift(1, population, dtype=np.uint16)
+    rows = np.bitwise_or.reduce(masks, axis=2)
+    cols = np.bitwise_or.reduce(masks, axis=1)
+    blocks = np.bitwise_or.reduce(
+        masks.reshape(size, 3, 3, 3, 3).transpose(0, 1, 3, 2, 4).reshape(size, 9, 9),
+        axis=2,
+    )
+    distinct = (
+        POPCOUNT[rows].sum(axis=1, dtype=np.int32)
+        + POPCOUNT[cols].sum(axis=1, dtype=np.int32)
+        + POPCOUNT[blocks].sum(axis=1, dtype=np.int32)
+    )
+    return 27 * 9 - distinct
+
+
+def create_population(puzzle, fixed_cells, size, rng):
+    """Vectorized create_individual: every row gets a random permutation of its missing digits."""
+    grid = np.asarray(puzzle, dtype=np.uint8)
+    fixed = np.asarray(fixed_cells, dtype=bool)
+    population = np.broadcast_to(grid, (size, 9, 9)).copy()
+    for i in range(9):
+        free = np.flatnonzero(~fixed[i])
+        if free.size == 0:
+            continue
+        nums = np.array([n for n in range(1, 10) if n not in puzzle[i]], dtype=np.uint8)
+        take = min(nums.size, free.size)
+        if take:
+            perms = rng.random((size, nums.size)).argsort(axis=1)[:, :take]
+            population[:, i, free[:take]] = nums[perms]
+        if take < free.size:
+            # Same fallback as create_individual: not enough digits, fill randomly
+            population[:, i, free[take:]] = rng.integers(
+                1, 10, size=(size, free.size - take), dtype=np.uint8
+            )
+    return population
+
+
+def free_positions(fixed_cells):
+    """Per-row table of non-fixed column indices (padded) and their counts."""
+    fixed = np.asarray(fixed_cells, dtype=bool)
+    free_idx = np.zeros((9, 9), dtype=np.intp)
+    free_count = np.zeros(9, dtype=np.intp)
+    for i in range(9):
+        free = np.flatnonzero(~fixed[i])
+        free_idx[i, : free.size] = free
+        free_count[i] = free.size
+    return free_idx, free_count
+
+
+def mutate_batch(children, free_idx, free_count, mutation_chance, rng):
+    """Vectorized mutate: with probability mutation_chance swap two free cells of one random row."""
+    n = children.shape[0]
+    rows = rng.integers(0, 9, size=n)
+    counts = free_count[rows]
+    selected = np.flatnonzero((rng.random(n) < mutation_chance) & (counts >= 2))
+    if selected.size == 0:
+        return
+    rows = rows[selected]
+    counts = counts[selected]
+    i1 = (rng.random(selected.size) * counts).astype(np.intp)
+    i2 = (rng.random(selected.size) * (counts - 1)).astype(np.intp)
+    i2 += i2 >= i1
+    c1 = free_idx[rows, i1]
+    c2 = free_idx[rows, i2]
+    first = children[selected, rows, c1]
+    children[selected, rows, c1] = children[selected, rows, c2]
+    children[selected, rows, c2] = first
+
+
+def sort_population(population, scores):
+    order = np.argsort(scores, kind="stable")
+    return population[order], scores[order]
+
+
+def genetic_algorithm(
+    puzzle,
+    fixed_cells,
+    population_size=2500,
+    generations=15000,
+    max_stagnation=50,
+    mutation_chance=0.92,
+    elitism_count=600,
+    seed=None,
+    verbose=True,
+    presolve=False,
+    time_budget=None,
+    cancel=None,
+    result=None,
+):
+    """
+    Drop-in replacement for main.genetic_algorithm.
+    The population is one (P, 9, 9) uint8 array, so fitness, crossover, mutation
+    and elitism selection run as whole-array operations.
+    With presolve, deduced cells are locked as fixed (candidate sets are not used here).
+    time_budget, cancel and result work as in main.genetic_algorithm.
+    Returns the best individual as a 9x9 list of ints. Only 9x9 boards are supported
+    (the digit masks and their popcount table are sized for 9 digits).
+    """
+    if len(puzzle) != 9:
+        raise ValueError(f"ga_numpy only supports 9x9 boards, got {len(puzzle)}x{len(puzzle)}")
+    start = time.perf_counter()
+    deadline = start + time_budget if time_budget is not None else None
+    if presolve:
+        puzzle, _ = propagate(puzzle)
+        fixed_cells = [[cell != 0 for cell in row] for row in puzzle]
+    rng = np.random.default_rng(seed)
+    free_idx, free_count = free_positions(fixed_cells)
+    n_children = population_size - elitism_count
+
+    # A vectorized build takes milliseconds, so deadline / cancel are checked after each build
+    population = create_population(puzzle, fixed_cells, population_size, rng)
+    population, scores = sort_population(population, fitness_batch(population))
+
+    best_fitness = scores[0]
+    stagnation_counter = 0
+    best_individual, best_score = population[0].copy(), scores[0]
+    generation = 0
+    stopped = stop_reason(deadline, cancel) or "generations"
+    if stopped != "generations":
+        generations = 0
+
+    for generation in range(1, generations + 1):
+        current_fitness = scores[0]
+        if current_fitness < best_score:
+            best_individual, best_score = population[0].copy(), current_fitness
+
+        if current_fitness == 0:
+            if verbose:
+                print(f"Solution found at generation {generation}")
+            if result is not None:
+                result.update(fitness=0, generations=generation, seconds=time.perf_counter() - start, stopped="solved")
+            return population[0].tolist()
+
+        stopped = stop_reason(deadline, cancel) or stopped
+        if stopped != "generations":
+            break
+
+        if current_fitness < best_fitness:
+            best_fitness = current_fitness
+            stagnation_counter = 0
+        else:
+            stagnation_counter += 1
+
+        if stagnation_counter >= max_stagnation:
+            if verbose:
+                print(f"No improvement for {max_stagnation} generations. Restarting population...")
+            population = create_population(puzzle, fixed_cells, population_size, rng)
+            population, scores = sort_population(population, fitness_batch(population))
+            stopped = stop_reason(deadline, cancel) or stopped
+            if stopped != "generations":
+                break
+            best_fitness = scores[0]
+            stagnation_counter = 0
+
+        elite = population[:elitism_count]
+
+        # Two distinct parents per child, chosen uniformly from the elites
+        first = rng.integers(0, elitism_count, size=n_children)
+        second = rng.integers(0, elitism_count - 1, size=n_children)
+        second += second >= first
+
+        # Row-wise uniform crossover
+        take_first = rng.random((n_children, 9)) < 0.5
+        children = np.where(take_first[:, :, None], elite[first], elite[second])
+        mutate_batch(children, free_idx, free_count, mutation_chance, rng)
+
+        population, scores = sort_population(
+            np.concatenate((elite, children)),
+            np.concatenate((scores[:elitism_count], fitness_batch(children))),
+        )
+
+        if verbose:
+            print(f"Generation {generation}, Best fitness: {scores[0]}")
+
+    if scores[0] < best_score:
+        best_individual, best_score = population[0], scores[0]
+    if result is not None:
+        result.update(
+            fitness=int(best_score), generations=generation, seconds=time.perf_counter() - start, stopped=stopped
+        )
+    if verbose:
+        print("No solution found." if stopped == "generations" else f"Stopped ({stopped}) at generation {generation}")
+    return best_individual.tolist()
+
+
+def time_per_generation(engine, puzzle, fixed_cells, generations=20, **kwargs):
+    """Average wall time of one generation, with restarts disabled (over the generations actually run)."""
+    result = {}
+    start = time.perf_counter()
+    engine(puzzle, fixed_cells, generations=generations, max_stagnation=generations + 1, result=result, **kwargs)
+    return (time.perf_counter() - start) / max(result["generations"], 1)
+
+
+if __name__ == "__main__":
+    import main
+
+    puzzle = read_puzzle("assignment 2/input.txt")
+    fixed_cells = [[cell != 0 for cell in row] for row in puzzle]
+    python_time = time_per_generation(
+        main.genetic_algorithm, puzzle, fixed_cells, generations=5, verbose=False
+    )
+    numpy_time = time_per_generation(genetic_algorithm, puzzle, fixed_cells, verbose=False)
+    print(f"main.genetic_algorithm: {python_time * 1000:.1f} ms/generation")
+    print(f"ga_numpy.genetic_algorithm: {numpy_time * 1000:.1f} ms/generation")
+    print(f"Speedup: {python_time / numpy_time:.1f}x")
@@ -0,0 +1,192 @@
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from math import isqrt
+
+from batch import format_puzzle_line, parse_puzzle_line
+from exact import SearchLimitExceeded, is_unique
+from propagation import propagate
+
+DIFFICULTIES = ("easy", "medium", "hard", "very_hard")
+# How many of the 81 cells the digger tries to blank before rating; harder buckets need
+# emptier grids. Larger boards blank the same share of their cells.
+TARGET_EMPTIES = {"easy": 40, "medium": 50, "hard": 58, "very_hard": 64}
+MAX_ATTEMPTS = 200
+# Search nodes per uniqueness check on boards larger than 9x9; a removal whose uniqueness
+# is not proven within the limit is undone, so generated puzzles stay unique
+DIG_NODE_LIMIT = 5000
+
+
+def target_empties(difficulty, base=3):
+    side = base * base
+    return round(TARGET_EMPTIES[difficulty] * side * side / 81)
+
+
+def solved_board(rng, base=3):
+    """
+    Random complete grid with base x base blocks: the pattern board from plot.generate_sudoku
+    with shuffled bands, stacks and digits.
+    """
+    side = base * base
+
+    def pattern(r, c):
+        return (base * (r % base) + r // base + c) % side
+
+    def shuffle(s):
+        return rng.sample(s, len(s))
+
+    rows = [g * base + r for g in shuffle(range(base)) for r in shuffle(range(base))]
+    cols = [g * base + c for g in shuffle(range(base)) for c in shuffle(range(base))]
+    nums = shuffle(range(1, side + 1))
+    board = [[nums[pattern(r, c)] for c in cols] for r in rows]
+    if rng.random() < 0.5:
+        board = [list(row) for row in zip(*board)]
+    return board
+
+
+def rate(puzzle):
+    """
+    Difficulty by the hardest deduction technique needed:
+    naked singles only -> easy, hidden singles -> medium, locked candidates -> hard,
+    not solvable by these techniques (search needed) -> very_hard.
+    Returns (difficulty, techniques) where techniques counts the progress of each technique.
+    """
+    techniques = {}
+    grid, _ = propagate(puzzle, techniques)
+    if any(0 in row for row in grid):
+        return "very_hard", techniques
+    if techniques.get("locked_candidates"):
+        return "hard", techniques
+    if techniques.get("hidden_singles"):
+        return "medium", techniques
+    return "easy", techniques
+
+
+def dig(board, empties, rng):
+    """
+    Blanks cells in random order, keeping a removal only if the puzzle still has a unique
+    solution (checked by the exact solver), until `empties` cells are blank or no cell can go.
+    On boards larger than 9x9 every check is bounded by DIG_NODE_LIMIT search nodes.
+    """
+    puzzle = [row[:] for row in board]
+    side = len(board)
+    node_limit = DIG_NODE_LIMIT if side > 9 else None
+    removed = 0
+    for p in rng.sample(range(side * side), side * side):
+        if removed >= empties:
+            break
+        r, c = divmod(p, side)
+        value, puzzle[r][c] = puzzle[r][c], 0
+        try:
+            unique = is_unique(puzzle, node_limit)
+        except SearchLimitExceeded:
+            unique = False
+        if unique:
+            removed += 1
+        else:
+            puzzle[r][c] = value
+    return puzzle
+
+
+def generate_puzzle(difficulty, seed, base=3):
+    """
+    One unique-solution puzzle rated as `difficulty`, with base x base blocks
+    (base=4 for 16x16, 5 for 25x25). Deterministic for a given seed.
+    Returns (puzzle, attempts) or (None, attempts) if no puzzle of that rating was found.
+    """
+    rng = random.Random(f"{difficulty}-{seed}" if base == 3 else f"{base}-{difficulty}-{seed}")
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        puzzle = dig(solved_board(rng, base), target_empties(difficulty, base), rng)
+        if rate(puzzle)[0] == difficulty:
+            return puzzle, attempt
+    return None, MAX_ATTEMPTS
+
+
+def generate_corpus(per_difficulty, seed=0, difficulties=DIFFICULTIES, workers=None, base=3):
+    """
+    {difficulty: [puzzle, ...]} generated on a process pool. Every puzzle has its own
+    seed derived from (seed, index), so the corpus does not depend on the number of workers.
+    """
+    jobs = [(d, f"{seed}-{i}", base) for d in difficulties for i in range(per_difficulty)]
+    corpus = {d: [] for d in difficulties}
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        for (difficulty, _, _), (puzzle, _) in zip(jobs, pool.map(generate_puzzle, *zip(*jobs), chunksize=4)):
+            if puzzle is not None:
+                corpus[difficulty].append(puzzle)
+    return corpus
+
+
+def write_corpus(path, corpus, seed):
+    """
+    Plain puzzle file readable by batch.py: one line per puzzle grouped under
+    '# difficulty: <name>' comments, with the generator settings in the first line.
+    """
+    per_difficulty = max((len(p) for p in corpus.values()), default=0)
+    side = next((len(p[0]) for p in corpus.values() if p), 9)
+    with open(path + ".tmp", "w") as f:
+        f.write(f"# generator seed={seed} per_difficulty={per_difficulty} base={isqrt(side)}\n")
+        for difficulty, puzzles in corpus.items():
+            f.write(f"# difficulty: {difficulty}\n")
+            for puzzle in puzzles:
+                f.write(format_puzzle_line(puzzle) + "\n")
+    os.replace(path + ".tmp", path)
+
+
+def read_corpus(path):
+    """Returns (settings, {difficulty: [puzzle, ...]})."""
+    settings, corpus, difficulty = {}, {}, None
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("# generator"):
+                settings = dict(item.split("=") for item in line.split()[2:])
+            elif line.startswith("# difficulty:"):
+                difficulty = line.split(":", 1)[1].strip()
+                corpus.setdefault(difficulty, [])
+            elif line and not line.startswith("#"):
+                corpus.setdefault(difficulty, []).append(parse_puzzle_line(line))
+    return settings, corpus
+
+
+def load_corpus(path, per_difficulty=10, seed=0, workers=None, base=3):
+    """
+    Reuses the corpus at `path` if it was generated with the same seed, block size and at
+    least per_difficulty puzzles; otherwise generates it and writes it there.
+    """
+    if os.path.exists(path):
+        settings, corpus = read_corpus(path)
+        if (
+            settings.get("seed") == str(seed)
+            and settings.get("base", "3") == str(base)
+            and int(settings.get("per_difficulty", 0)) >= per_difficulty
+        ):
+            return {d: puzzles[:per_difficulty] for d, puzzles in corpus.items()}
+    corpus = generate_corpus(per_difficulty, seed, workers=workers, base=base)
+    write_corpus(path, corpus, seed)
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Unique-solution Sudoku generator rated by deduction techniques")
+    parser.add_argument("--per-difficulty", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--block-size", type=int, default=3, help="3 for 9x9, 4 for 16x16, 5 for 25x25")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="puzzles.txt")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    corpus = generate_corpus(args.per_difficulty, args.seed, workers=args.workers, base=args.block_size)
+    write_corpus(args.out, corpus, args.seed)
+    elapsed = time.perf_counter() - start
+    for difficulty, puzzles in corpus.items():
+        givens = [sum(cell != 0 for row in p for cell in row) for p in puzzles]
+        mean = sum(givens) / len(givens) if givens else 0
+        print(f"{difficulty:<10} {len(puzzles):>5} puzzles, {mean:.1f} givens on average")
+    print(f"Wrote {args.out} in {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
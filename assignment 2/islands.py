@@ -0,0 +1,243 @@
+import multiprocessing
+import os
+import queue
+import random
+import time
+
+from main import evaluate, initial_population, next_generation, read_puzzle, to_grid, write_solution
+from propagation import propagate
+
+TOPOLOGIES = ("ring", "complete", "random")
+# Seconds between deadline / cancel checks while the parent waits for island results
+STOP_POLL_INTERVAL = 0.05
+
+
+def migration_targets(topology, index, islands):
+    """Indices of the islands that receive migrants from island `index`."""
+    if islands < 2:
+        return []
+    if topology == "ring":
+        return [(index + 1) % islands]
+    if topology == "complete":
+        return [i for i in range(islands) if i != index]
+    if topology == "random":
+        return [random.choice([i for i in range(islands) if i != index])]
+    raise ValueError(f"Unknown migration topology: {topology}")
+
+
+def receive_migrants(population, inbox):
+    """Replace the worst individuals with every migrant waiting in the inbox."""
+    migrants = []
+    while True:
+        try:
+            migrants.extend(inbox.get_nowait())
+        except queue.Empty:
+            break
+    if migrants:
+        migrants = migrants[: len(population)]
+        population[-len(migrants):] = [evaluate(ind) for ind in migrants]
+        population.sort(key=lambda ind: ind[1])
+
+
+def run_island(
+    index,
+    puzzle,
+    fixed_cells,
+    inboxes,
+    stop,
+    results,
+    seed,
+    topology,
+    migration_interval,
+    migration_size,
+    population_size,
+    generations,
+    max_stagnation,
+    mutation_chance,
+    elitism_count,
+    candidates,
+):
+    """
+    One island: the loop of main.genetic_algorithm plus migration.
+    Every migration_interval generations it sends copies of its best individuals
+    to its targets and takes in whatever migrants were sent to it.
+    """
+    if seed is not None:
+        random.seed(seed + index)
+    # Migrants are best-effort, a finished island must not block on a full pipe
+    for inbox in inboxes:
+        inbox.cancel_join_thread()
+
+    # stop is also checked while populations are built, so a deadline hit during the build is honoured
+    population = initial_population(puzzle, fixed_cells, population_size, candidates, cancel=stop)
+    best_fitness = population[0][1]
+    stagnation_counter = 0
+    generation = 0
+    best_entry = population[0]
+
+    while generation < generations and not stop.is_set():
+        generation += 1
+        population.sort(key=lambda ind: ind[1])
+        current_fitness = population[0][1]
+        if current_fitness < best_entry[1]:
+            best_entry = population[0]
+
+        if current_fitness == 0:
+            stop.set()
+            break
+
+        if current_fitness < best_fitness:
+            best_fitness = current_fitness
+            stagnation_counter = 0
+        else:
+            stagnation_counter += 1
+
+        if stagnation_counter >= max_stagnation:
+            population = initial_population(puzzle, fixed_cells, population_size, candidates, cancel=stop)
+            if len(population) < population_size:
+                break
+            best_fitness = population[0][1]
+            stagnation_counter = 0
+
+        if generation % migration_interval == 0:
+            migrants = [ind for ind, _, _ in population[:migration_size]]
+            for target in migration_targets(topology, index, len(inboxes)):
+                inboxes[target].put(migrants)
+            receive_migrants(population, inboxes[index])
+
+        population = next_generation(
+            population, fixed_cells, population_size, mutation_chance, elitism_count, candidates
+        )
+
+    population.sort(key=lambda ind: ind[1])
+    if population[0][1] < best_entry[1]:
+        best_entry = population[0]
+    results.put((index, to_grid(best_entry[0]), best_entry[1], generation))
+
+
+def island_genetic_algorithm(
+    puzzle,
+    fixed_cells,
+    islands=None,
+    topology="ring",
+    migration_interval=20,
+    migration_size=10,
+    seed=None,
+    population_size=600,
+    generations=15000,
+    max_stagnation=50,
+    mutation_chance=0.92,
+    elitism_count=150,
+    presolve=False,
+    verbose=True,
+    time_budget=None,
+    cancel=None,
+    result=None,
+):
+    """
+    Island model: `islands` sub-populations (one per core by default) evolve in separate
+    processes and exchange their best individuals through the migration topology.
+    All islands stop as soon as one of them reaches fitness 0, when time_budget seconds
+    have passed or when the cancel token is set; the parent polls both while it waits,
+    so the islands finish their current generation and report their best individuals.
+    result is filled like in main.genetic_algorithm (generations is the longest island run).
+    An island process that dies without reporting is counted as finished; RuntimeError
+    is raised if no island reported at all.
+    Returns the best individual, like genetic_algorithm.
+    """
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"Unknown migration topology: {topology}")
+    start = time.perf_counter()
+    deadline = start + time_budget if time_budget is not None else None
+    islands = islands or os.cpu_count() or 1
+    candidates = None
+    if presolve:
+        puzzle, candidates = propagate(puzzle)
+        fixed_cells = [[cell != 0 for cell in row] for row in puzzle]
+
+    context = multiprocessing.get_context()
+    inboxes = [context.Queue() for _ in range(islands)]
+    results = context.Queue()
+    stop = context.Event()
+
+    workers = [
+        context.Process(
+            target=run_island,
+            args=(
+                index,
+                puzzle,
+                fixed_cells,
+                inboxes,
+                stop,
+                results,
+                seed,
+                topology,
+                migration_interval,
+                migration_size,
+                population_size,
+                generations,
+                max_stagnation,
+                mutation_chance,
+                elitism_count,
+                candidates,
+            ),
+            daemon=True,
+        )
+        for index in range(islands)
+    ]
+    for worker in workers:
+        worker.start()
+
+    best = None
+    stopped = "generations"
+    longest = 0
+    reported = set()
+    try:
+        while len(reported) < islands:
+            if not stop.is_set():
+                if deadline is not None and time.perf_counter() >= deadline:
+                    stopped = "deadline"
+                    stop.set()
+                elif cancel is not None and cancel.is_set():
+                    stopped = "cancelled"
+                    stop.set()
+            try:
+                index, individual, score, generation = results.get(timeout=STOP_POLL_INTERVAL)
+            except queue.Empty:
+                # A clean exit flushes the result first, only a crashed island never reports
+                for index, worker in enumerate(workers):
+                    if index not in reported and worker.exitcode not in (None, 0):
+                        if verbose:
+                            print(f"Island {index} died with exit code {worker.exitcode}")
+                        reported.add(index)
+                continue
+            reported.add(index)
+            longest = max(longest, generation)
+            if score == 0:
+                if verbose:
+                    print(f"Island {index} found a solution at generation {generation}")
+                stopped = "solved"
+                stop.set()
+            if best is None or score < best[1]:
+                best = (individual, score)
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+
+    if best is None:
+        raise RuntimeError("Every island process died before reporting a result")
+    if result is not None:
+        result.update(fitness=best[1], generations=longest, seconds=time.perf_counter() - start, stopped=stopped)
+    if verbose and best[1] != 0:
+        print("No solution found.")
+    return best[0]
+
+
+if __name__ == "__main__":
+    puzzle = read_puzzle("assignment 2/input.txt")
+    fixed_cells = [[cell != 0 for cell in row] for row in puzzle]
+    solution = island_genetic_algorithm(puzzle, fixed_cells, presolve=True)
+    write_solution(solution, "output.txt")
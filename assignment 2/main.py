@@ -1,5 +1,16 @@
-import copy
+import argparse
+import heapq
 import random
+from collections import deque, namedtuple
+from functools import lru_cache
+from math import isqrt
+from time import perf_counter
+
+from adaptive import AdaptiveControl
+from fitness_cache import DUPLICATE_POLICIES, FitnessCache
+from profiling import GAProfiler, JsonlSink
+from propagation import propagate
+from selection import get_strategy, move_best_to_front, select_elites, truncation_parents
 
 # def read_puzzle_console():
 #     """
@@ -64,31 +75,84 @@ def print_puzzle(puzzle):
         print(" ".join(str(val) if val != 0 else "_" for val in row))
 
 def fitness(individual):
+    n = len(individual)
+    base = isqrt(n)
     score = 0
     # Row fitness
     for row in individual:
-        score += 9 - len(set(row))
+        score += n - len(set(row))
     # Column fitness
     for col in zip(*individual):
-        score += 9 - len(set(col))
+        score += n - len(set(col))
     # Subgrid fitness
-    for i in range(3):
-        for j in range(3):
+    for i in range(base):
+        for j in range(base):
             block = []
-            for x in range(3):
-                for y in range(3):
-                    block.append(individual[3 * i + x][3 * j + y])
-            score += 9 - len(set(block))
+            for x in range(base):
+                for y in range(base):
+                    block.append(individual[base * i + x][base * j + y])
+            score += n - len(set(block))
     return score
 
-def create_individual(puzzle, fixed_cells):
+def legal_row_fill(free, nums, row_candidates):
+    """
+    Random assignment of nums to the free cells of a row such that every cell
+    gets one of its candidates. Returns {col: digit} or None if there is none.
+    Bipartite matching with augmenting paths (Kuhn) over shuffled cells and digits:
+    O(cells * edges), so rows of 16 or 25 free cells do not blow up like backtracking.
+    """
+    order = list(free)
+    random.shuffle(order)
+    options = {}
+    for j in order:
+        options[j] = [n for n in nums if n in row_candidates[j]]
+        random.shuffle(options[j])
+    owner = {}  # digit -> column
+
+    def augment(j, visited):
+        for n in options[j]:
+            if n in visited:
+                continue
+            visited.add(n)
+            if n not in owner or augment(owner[n], visited):
+                owner[n] = j
+                return True
+        return False
+
+    for j in order:
+        if not augment(j, set()):
+            return None
+    return {j: n for n, j in owner.items()}
+
+# Individuals are compact and immutable: a tuple of n rows, each row an n-byte `bytes`
+# (n = 9 for the classic board, 16 or 25 for the larger ones; digits up to 255 fit a byte).
+# Children share unchanged rows with their parents, so crossover copies nothing and
+# mutation builds a new tuple with one new row.
+
+def swap_cells(individual, row, i1, i2):
+    """New individual with cells (row, i1) and (row, i2) swapped."""
+    values = bytearray(individual[row])
+    values[i1], values[i2] = values[i2], values[i1]
+    return individual[:row] + (bytes(values),) + individual[row + 1:]
+
+def to_grid(individual):
+    return [list(row) for row in individual]
+
+def create_individual(puzzle, fixed_cells, candidates=None):
+    size = len(puzzle)
     individual = []
-    for i in range(9):
-        nums = [n for n in range(1, 10) if n not in puzzle[i]]
+    for i in range(size):
+        nums = [n for n in range(1, size + 1) if n not in puzzle[i]]
+        if candidates is not None:
+            free = [j for j in range(size) if not fixed_cells[i][j]]
+            assignment = legal_row_fill(free, nums, candidates[i]) if len(free) == len(nums) else None
+            if assignment is not None:
+                individual.append(bytes(assignment.get(j, puzzle[i][j]) for j in range(size)))
+                continue
         random.shuffle(nums)
         row = []
         idx = 0
-        for j in range(9):
+        for j in range(size):
             if fixed_cells[i][j]:
                 row.append(puzzle[i][j])
             else:
@@ -97,29 +161,348 @@ def create_individual(puzzle, fixed_cells):
                     idx += 1
                 else:
                     # Если не хватает чисел, заполнить случайным образом (может привести к дубликатам)
-                    row.append(random.randint(1, 9))
-        individual.append(row)
-    return individual
+                    row.append(random.randint(1, size))
+        individual.append(bytes(row))
+    return tuple(individual)
     
 
-def mutate(individual, fixed_cells):
-    row = random.randint(0, 8)
-    indices = [i for i in range(9) if not fixed_cells[row][i]]
+def mutate(individual, fixed_cells, candidates=None):
+    """Returns (new individual, (row, i1, i2)) or (individual, None) if no swap was possible."""
+    row = random.randrange(len(individual))
+    indices = [i for i, fixed in enumerate(fixed_cells[row]) if not fixed]
+    if candidates is not None:
+        # Only swaps that keep both cells on legal candidates
+        values = individual[row]
+        pairs = [
+            (i1, i2)
+            for k, i1 in enumerate(indices)
+            for i2 in indices[k + 1:]
+            if values[i1] in candidates[row][i2] and values[i2] in candidates[row][i1]
+        ]
+        if not pairs:
+            return individual, None
+        i1, i2 = random.choice(pairs)
+        return swap_cells(individual, row, i1, i2), (row, i1, i2)
     if len(indices) >= 2:
         i1, i2 = random.sample(indices, 2)
-        individual[row][i1], individual[row][i2] = (
-            individual[row][i2],
-            individual[row][i1],
-        )
+        return swap_cells(individual, row, i1, i2), (row, i1, i2)
+    return individual, None
 
 def crossover(parent1, parent2):
-    child = []
-    for i in range(9):
-        if random.random() < 0.5:
-            child.append(copy.deepcopy(parent1[i]))
+    return tuple(
+        parent1[i] if random.random() < 0.5 else parent2[i] for i in range(len(parent1))
+    )
+
+# Incremental fitness.
+# Every population entry is (individual, fitness, counts), counts = (row_scores, units):
+# row_scores[i] is n - len(set(row i)), units is one bytearray of digit counts with
+# stride = n + 1 slots per unit: units[stride * c + v] for column c and
+# units[blocks[r][c] + v] for the block of cell (r, c), see geometry().
+# The fitness of a column or block is the number of digits missing from it.
+# Memory per entry is n + 2n(n + 1) bytes of counts plus the n row objects.
+
+Geometry = namedtuple("Geometry", "n base stride blocks size")
+
+@lru_cache(maxsize=None)
+def geometry(n):
+    """Unit layout of an n x n board with sqrt(n) x sqrt(n) blocks."""
+    base = isqrt(n)
+    if base * base != n:
+        raise ValueError(f"Board size must be a perfect square, got {n}")
+    stride = n + 1
+    block_base = n * stride
+    blocks = tuple(
+        tuple(block_base + stride * (base * (r // base) + c // base) for c in range(n))
+        for r in range(n)
+    )
+    return Geometry(n, base, stride, blocks, 2 * block_base)
+
+def unit_counts(individual):
+    n = len(individual)
+    geo = geometry(n)
+    stride = geo.stride
+    row_scores = bytearray(n - len(set(row)) for row in individual)
+    units = bytearray(geo.size)
+    for row, blocks in zip(individual, geo.blocks):
+        for c, val in enumerate(row):
+            units[stride * c + val] += 1
+            units[blocks[c] + val] += 1
+    return row_scores, units
+
+def score_counts(counts):
+    row_scores, units = counts
+    return sum(row_scores) + units.count(0) - 2 * len(row_scores)  # index 0 of every unit is never used
+
+def evaluate(individual):
+    counts = unit_counts(individual)
+    return individual, score_counts(counts), counts
+
+def _move(units, base, old, new):
+    # Replace one occurrence of old with new in a unit, return the change in missing digits
+    units[base + old] -= 1
+    units[base + new] += 1
+    return (units[base + old] == 0) - (units[base + new] == 1)
+
+def swap_delta(individual, counts, row, i1, i2):
+    """
+    Update counts after cells (row, i1) and (row, i2) were swapped, return the fitness delta.
+    The row itself keeps its digits, so only two columns and at most two blocks change.
+    """
+    units = counts[1]
+    new1, new2 = individual[row][i1], individual[row][i2]
+    if new1 == new2:
+        return 0
+    geo = geometry(len(individual))
+    delta = _move(units, geo.stride * i1, new2, new1) + _move(units, geo.stride * i2, new1, new2)
+    b1 = geo.blocks[row][i1]
+    b2 = geo.blocks[row][i2]
+    if b1 != b2:
+        delta += _move(units, b1, new2, new1) + _move(units, b2, new1, new2)
+    return delta
+
+def crossover_scored(parent1, parent2):
+    """
+    Crossover of two population entries. The child's counts start as a copy of the
+    first parent's and only the rows inherited from the second parent are patched in.
+    """
+    return inherit_counts(parent1, parent2, crossover(parent1[0], parent2[0]))
+
+def inherit_counts(parent1, parent2, child):
+    """Scores a child whose rows all come from parent1 or parent2 (see crossover_scored)."""
+    ind1, score1, (row_scores1, units1) = parent1
+    _, _, (row_scores2, _) = parent2
+    row_scores = bytearray(row_scores1)
+    units = bytearray(units1)
+    score = score1
+    geo = geometry(len(child))
+    stride = geo.stride
+    for i, row in enumerate(child):
+        if row is ind1[i] or row == ind1[i]:
+            continue
+        score += row_scores2[i] - row_scores[i]
+        row_scores[i] = row_scores2[i]
+        blocks = geo.blocks[i]
+        for c, (old, new) in enumerate(zip(ind1[i], row)):
+            if old != new:
+                score += _move(units, stride * c, old, new) + _move(units, blocks[c], old, new)
+    return child, score, (row_scores, units)
+
+# Memetic mode: bounded tabu-guided local search on the elites
+
+def swap_gain(individual, counts, row, i1, i2):
+    """Fitness delta of swapping (row, i1) and (row, i2), without changing anything."""
+    units = counts[1]
+    a, b = individual[row][i1], individual[row][i2]
+    if a == b:
+        return 0
+    geo = geometry(len(individual))
+    c1, c2 = geo.stride * i1, geo.stride * i2
+    delta = (units[c1 + a] == 1) - (units[c1 + b] == 0) + (units[c2 + b] == 1) - (units[c2 + a] == 0)
+    b1 = geo.blocks[row][i1]
+    b2 = geo.blocks[row][i2]
+    if b1 != b2:
+        delta += (units[b1 + a] == 1) - (units[b1 + b] == 0) + (units[b2 + b] == 1) - (units[b2 + a] == 0)
+    return delta
+
+def in_conflict(individual, counts, row, col):
+    units = counts[1]
+    val = individual[row][col]
+    geo = geometry(len(individual))
+    return units[geo.stride * col + val] > 1 or units[geo.blocks[row][col] + val] > 1
+
+def local_search(entry, fixed_cells, candidates=None, steps=10, tabu_tenure=10):
+    """
+    Steepest descent over swaps inside a row where at least one cell is in conflict.
+    Sideways moves are allowed, recently made swaps are tabu so they are not undone
+    right away. Stops after `steps` moves or when every allowed swap makes things worse.
+    Returns the improved entry with its own copy of the counts (counts of population
+    entries are shared with the fitness cache and never changed in place).
+    """
+    individual, score, (row_scores, units) = entry
+    counts = (row_scores, bytearray(units))
+    tabu = deque(maxlen=tabu_tenure)
+    for _ in range(steps):
+        if score == 0:
+            break
+        best_move, best_delta = None, 1
+        for row in range(len(individual)):
+            free = [j for j, fixed in enumerate(fixed_cells[row]) if not fixed]
+            values = individual[row]
+            for k, i1 in enumerate(free):
+                conflict1 = in_conflict(individual, counts, row, i1)
+                for i2 in free[k + 1:]:
+                    if not conflict1 and not in_conflict(individual, counts, row, i2):
+                        continue
+                    if candidates is not None and (
+                        values[i1] not in candidates[row][i2] or values[i2] not in candidates[row][i1]
+                    ):
+                        continue
+                    delta = swap_gain(individual, counts, row, i1, i2)
+                    # Tabu moves are only taken if they solve the puzzle (aspiration)
+                    if (row, i1, i2) in tabu and score + delta > 0:
+                        continue
+                    if delta < best_delta:
+                        best_move, best_delta = (row, i1, i2), delta
+        if best_move is None or best_delta > 0:
+            break
+        individual = swap_cells(individual, *best_move)
+        score += swap_delta(individual, counts, *best_move)
+        tabu.append(best_move)
+    return individual, score, counts
+
+# Individuals built between deadline / cancel checks in initial_population
+POPULATION_CHECK_INTERVAL = 16
+
+def stop_reason(deadline, cancel):
+    """"deadline" or "cancelled" if the run has to stop now, else None."""
+    if deadline is not None and perf_counter() >= deadline:
+        return "deadline"
+    if cancel is not None and cancel.is_set():
+        return "cancelled"
+    return None
+
+def initial_population(puzzle, fixed_cells, population_size, candidates=None, deadline=None, cancel=None):
+    """
+    population_size scored individuals, best first. With deadline (a perf_counter() time)
+    or cancel, both are checked every POPULATION_CHECK_INTERVAL individuals and a stop
+    returns the (non-empty) part built so far.
+    """
+    population = []
+    for k in range(population_size):
+        if k and k % POPULATION_CHECK_INTERVAL == 0 and stop_reason(deadline, cancel):
+            break
+        population.append(evaluate(create_individual(puzzle, fixed_cells, candidates)))
+    population.sort(key=lambda ind: ind[1])
+    return population
+
+def check_incremental(sizes=(9, 16), trials=200, seed=0):
+    """
+    Randomized check of the incremental scoring against fitness() and unit_counts():
+    evaluate, crossover_scored, mutate + swap_delta and local_search on random boards
+    with random fixed cells. Prints every mismatch, returns True if there were none.
+    """
+    random.seed(seed)
+    failures = 0
+
+    def expect(name, n, entry):
+        nonlocal failures
+        individual, score, counts = entry
+        if score != fitness(individual) or tuple(counts) != unit_counts(individual):
+            failures += 1
+            print(f"{name} n={n}: score {score}, fitness {fitness(individual)}")
+
+    for n in sizes:
+        for _ in range(trials):
+            puzzle = [[v if random.random() < 0.3 else 0 for v in random.sample(range(1, n + 1), n)] for _ in range(n)]
+            fixed_cells = [[cell != 0 for cell in row] for row in puzzle]
+            parent1 = evaluate(create_individual(puzzle, fixed_cells))
+            parent2 = evaluate(create_individual(puzzle, fixed_cells))
+            expect("evaluate", n, parent1)
+            expect("crossover_scored", n, crossover_scored(parent1, parent2))
+
+            individual, score, (row_scores, units) = parent1
+            counts = (row_scores, bytearray(units))
+            for _ in range(5):
+                individual, swap = mutate(individual, fixed_cells)
+                if swap is not None:
+                    score += swap_delta(individual, counts, *swap)
+            expect("mutate+swap_delta", n, (individual, score, counts))
+
+            units_before = bytes(parent2[2][1])
+            expect("local_search", n, local_search(parent2, fixed_cells, steps=5))
+            if parent2[2][1] != units_before:
+                failures += 1
+                print(f"local_search n={n}: changed the counts of its input entry")
+    print(f"Incremental fitness check: {failures} mismatches ({trials} trials per size, sizes {list(sizes)})")
+    return failures == 0
+
+def next_generation(
+    population, fixed_cells, population_size, mutation_chance, elitism_count, candidates=None,
+    cache=None, duplicates=None, profiler=None, max_retries=5, strategy=None
+):
+    """
+    Elites plus children of parent pairs. The child genome is built first (crossover,
+    then mutation) and scored from the parents' counts, or taken from the cache.
+    strategy: parent-pair source from selection.py. None is the original truncation scheme
+        on a sorted population (elites are its prefix, both parents uniformly from them);
+        with a strategy the population may be unsorted and elites come from select_elites.
+    cache: optional FitnessCache of scored genomes.
+    duplicates: with a cache, None keeps duplicate children, "reject" draws new parents instead
+        (at most max_retries * population_size times per generation), "remutate" applies up to
+        max_retries extra mutations until the child is new.
+    profiler: optional GAProfiler; every phase is timed only when it is given.
+    """
+    if strategy is None:
+        elites = population[:elitism_count]
+        strategy = truncation_parents
+    else:
+        elites = select_elites(population, elitism_count)
+    new_population = list(elites)  # Elitism
+    seen = {ind for ind, _, _ in elites} if duplicates is not None else None
+    rejections_left = max_retries * population_size
+    pairs = iter(())
+    if profiler is not None:
+        add = profiler.add
+
+    while len(new_population) < population_size:
+        if profiler is not None:
+            t0 = perf_counter()
+        pair = next(pairs, None)
+        if pair is None:
+            # Rejected duplicates use up pairs, draw more for the children still missing
+            pairs = iter(strategy(population, elites, population_size - len(new_population)))
+            pair = next(pairs)
+        parent1, parent2 = pair
+        if profiler is not None:
+            t1 = perf_counter()
+            add("select", t1 - t0)
+        base = crossover(parent1[0], parent2[0])
+        child, swaps = base, []
+        if profiler is not None:
+            t2 = perf_counter()
+            add("crossover", t2 - t1)
+        if random.random() < mutation_chance:
+            child, swap = mutate(child, fixed_cells, candidates)
+            if swap is not None:
+                swaps.append((child, swap))
+        if profiler is not None:
+            t3 = perf_counter()
+            add("mutate", t3 - t2)
+
+        if seen is not None and child in seen:
+            if duplicates == "reject" and rejections_left > 0:
+                rejections_left -= 1
+                cache.rejected += 1
+                continue
+            if duplicates == "remutate":
+                for _ in range(max_retries):
+                    child, swap = mutate(child, fixed_cells, candidates)
+                    if swap is not None:
+                        swaps.append((child, swap))
+                    if child not in seen:
+                        cache.remutated += 1
+                        break
+
+        cached = cache.get(child) if cache is not None else None
+        if cached is not None:
+            child_fitness, counts = cached
         else:
-            child.append(copy.deepcopy(parent2[i]))
-    return child
+            _, child_fitness, counts = inherit_counts(parent1, parent2, base)
+            for individual, swap in swaps:
+                child_fitness += swap_delta(individual, counts, *swap)
+            if cache is not None:
+                cache.put(child, child_fitness, counts)
+            if profiler is not None:
+                profiler.evaluated()
+        if profiler is not None:
+            add("fitness", perf_counter() - t3)
+        if seen is not None:
+            seen.add(child)
+        new_population.append((child, child_fitness, counts))
+
+    if cache is not None:
+        cache.diversity.append(len({ind for ind, _, _ in new_population}) / len(new_population))
+    return new_population
 
 def genetic_algorithm(
     puzzle,
@@ -129,29 +512,124 @@ def genetic_algorithm(
     max_stagnation=50,
     mutation_chance=0.92,
     elitism_count=600,
+    verbose=True,
+    presolve=False,
+    memetic=False,
+    memetic_count=20,
+    local_search_steps=10,
+    tabu_tenure=10,
+    history=None,
+    adaptive=None,
+    profiler=None,
+    log_every=1,
+    fitness_cache=None,
+    duplicates=None,
+    selection=None,
+    time_budget=None,
+    cancel=None,
+    result=None,
 ):
-    # Initialize population with fitness values
-    population = [
-        (create_individual(puzzle, fixed_cells), 0) for _ in range(population_size)
-    ]
-    # Compute fitness for initial population
-    for i in range(population_size):
-        population[i] = (population[i][0], fitness(population[i][0]))
-
-    # Sort initial population
-    population.sort(key=lambda ind: ind[1])
+    """
+    memetic: run a bounded local_search on the best memetic_count individuals every generation.
+    history: optional list, the best fitness of every generation is appended to it.
+    adaptive: an AdaptiveControl (or True for one built from the arguments) that sets
+        mutation_chance, elitism_count and restarts every generation.
+    profiler: optional profiling.GAProfiler that records per-phase timings and counters.
+    log_every: with verbose, print the generation line every log_every generations (0 = never).
+    fitness_cache: optional fitness_cache.FitnessCache (or a max size) that memoizes scored children.
+    duplicates: with fitness_cache, None, "reject" or "remutate" duplicate children.
+    selection: None for the original truncation scheme, or a strategy from selection.py
+        ("truncation", "tournament", "rank", "sus") that skips the full sorts.
+    time_budget: wall-clock seconds; the run stops after the first generation past the deadline.
+    cancel: optional token with is_set() (threading.Event, multiprocessing.Event) checked every generation.
+        Both are also checked while a population is built (initial or restart), see initial_population.
+    result: optional dict filled with fitness, generations, seconds and stopped
+        ("solved", "deadline", "cancelled" or "generations").
+    Without a solution the best individual seen in the run (across restarts) is returned.
+    """
+    if duplicates not in DUPLICATE_POLICIES:
+        raise ValueError(f"Unknown duplicate policy: {duplicates}")
+    if duplicates is not None and fitness_cache is None:
+        fitness_cache = FitnessCache()
+    if isinstance(fitness_cache, int):
+        fitness_cache = FitnessCache(fitness_cache)
+    strategy = get_strategy(selection) if selection is not None else None
+    if adaptive is True:
+        adaptive = AdaptiveControl(mutation_chance, elitism_count, max_stagnation, population_size)
+    start = perf_counter()
+    deadline = start + time_budget if time_budget is not None else None
+
+    candidates = None
+    if presolve:
+        # Lock every deducible cell and restrict free cells to their candidates
+        puzzle, candidates = propagate(puzzle)
+        fixed_cells = [
+            [fixed or cell != 0 for fixed, cell in zip(fixed_row, row)]
+            for fixed_row, row in zip(fixed_cells, puzzle)
+        ]
+
+    # Initialize population with fitness values and cached unit counts
+    population = initial_population(puzzle, fixed_cells, population_size, candidates, deadline, cancel)
+    if profiler is not None:
+        profiler.evaluations += len(population)
 
     best_fitness = population[0][1]
     stagnation_counter = 0
+    best_entry = population[0]
+    generation = 0
+    stopped = "generations"
+    if len(population) < population_size:
+        # Stopped while the first population was built: no generation runs
+        stopped = stop_reason(deadline, cancel)
+        generations = 0
 
     for generation in range(1, generations+1):
+        if profiler is not None:
+            profiler.start_generation()
+            t = perf_counter()
         # Sort population based on fitness
-        population.sort(key=lambda ind: ind[1])
+        if strategy is None:
+            population.sort(key=lambda ind: ind[1])
+        if profiler is not None:
+            profiler.add("sort", perf_counter() - t)
+        if memetic:
+            if profiler is not None:
+                t = perf_counter()
+            if strategy is None:
+                top = range(min(memetic_count, len(population)))
+            else:
+                top = heapq.nsmallest(memetic_count, range(len(population)), key=lambda i: population[i][1])
+            for i in top:
+                population[i] = local_search(
+                    population[i], fixed_cells, candidates, local_search_steps, tabu_tenure
+                )
+            if strategy is None:
+                population.sort(key=lambda ind: ind[1])
+            if profiler is not None:
+                profiler.add("local_search", perf_counter() - t)
+        if strategy is not None:
+            move_best_to_front(population)
         current_fitness = population[0][1]
+        if current_fitness < best_entry[1]:
+            best_entry = population[0]
+        if history is not None:
+            history.append(current_fitness)
 
         if current_fitness == 0:
-            print(f"Solution found at generation {generation}") #++++++++++++++++++++++++++++++++++++++++
-            return population[0][0]
+            if profiler is not None:
+                profiler.end_generation(generation, current_fitness, population)
+            if verbose:
+                print(f"Solution found at generation {generation}") #++++++++++++++++++++++++++++++++++++++++
+            if result is not None:
+                result.update(fitness=0, generations=generation, seconds=perf_counter() - start, stopped="solved")
+            return to_grid(population[0][0])
+
+        # Cooperative stop: one clock read and one flag check per generation
+        stopped = stop_reason(deadline, cancel) or stopped
+        if stopped != "generations":
+            if profiler is not None:
+                profiler.end_generation(generation, current_fitness, population)
+            break
 
         if current_fitness < best_fitness:
             best_fitness = current_fitness
@@ -159,60 +637,169 @@ def genetic_algorithm(
         else:
             stagnation_counter += 1
 
-        if stagnation_counter >= max_stagnation:
-            print(
-                f"No improvement for {max_stagnation} generations. Restarting population..."  #++++++++++++++++++++++++++++++++++++++++
+        if adaptive is not None:
+            mutation_chance, elitism_count, restart = adaptive.update(
+                generation, population, current_fitness, stagnation_counter
             )
-            population = [
-                (create_individual(puzzle, fixed_cells), 0)
-                for _ in range(population_size)
-            ]
-            for i in range(population_size):
-                population[i] = (population[i][0], fitness(population[i][0]))
-            # Sort the new population
-            population.sort(key=lambda ind: ind[1])
+        else:
+            restart = stagnation_counter >= max_stagnation
+
+        if restart:
+            if verbose:
+                print(
+                    f"No improvement for {stagnation_counter} generations. Restarting population..."  #++++++++++++++++++++++++++++++++++++++++
+                )
+            if profiler is not None:
+                t = perf_counter()
+            population = initial_population(puzzle, fixed_cells, population_size, candidates, deadline, cancel)
+            if profiler is not None:
+                profiler.add("restart", perf_counter() - t)
+                profiler.evaluated(len(population))
+                profiler.restarted()
+            if population[0][1] < best_entry[1]:
+                best_entry = population[0]
+            if len(population) < population_size:
+                stopped = stop_reason(deadline, cancel)
+                if profiler is not None:
+                    profiler.end_generation(generation, current_fitness, population)
+                break
             best_fitness = population[0][1]
             stagnation_counter = 0
 
-        new_population = population[:elitism_count]  # Elitism
+        population = next_generation(
+            population, fixed_cells, population_size, mutation_chance, elitism_count, candidates,
+            fitness_cache, duplicates, profiler, strategy=strategy
+        )
+        if profiler is not None:
+            profiler.end_generation(generation, current_fitness, population)
+
+        # Print current generation
+        if verbose and log_every and generation % log_every == 0:
+            print(f"Generation {generation}, Best fitness: {population[0][1]}")  #++++++++++++++++++++++++++++++++++++++++
 
-        while len(new_population) < population_size:
-            parents = random.sample(population[:elitism_count], 2)
-            child = crossover(parents[0][0], parents[1][0])
-            if random.random() < mutation_chance:
-                mutate(child, fixed_cells)
-            child_fitness = fitness(child)
-            new_population.append((child, child_fitness))
+    if stopped == "generations":
+        # Children of the last generation were never compared
+        last_best = min(population, key=lambda ind: ind[1])
+        if last_best[1] < best_entry[1]:
+            best_entry = last_best
+    if result is not None:
+        result.update(
+            fitness=best_entry[1], generations=generation, seconds=perf_counter() - start, stopped=stopped
+        )
+    if verbose:
+        if stopped == "deadline":
+            print(f"Time budget exhausted at generation {generation}, best fitness: {best_entry[1]}")
+        elif stopped == "cancelled":
+            print(f"Cancelled at generation {generation}, best fitness: {best_entry[1]}")
+        else:
+            print("No solution found.")
+    return to_grid(best_entry[0])
 
-        population = new_population
 
-        # Print current generation
-        print(f"Generation {generation}, Best fitness: {population[0][1]}")  #++++++++++++++++++++++++++++++++++++++++
+def solve_anytime(puzzle, fixed_cells, time_budget=None, cancel=None, **kwargs):
+    """
+    genetic_algorithm under a time budget and/or cancellation token, quiet by default.
+    Returns {"grid", "fitness", "generations", "seconds", "stopped"}; the grid is the best
+    individual found so far when the run is stopped early.
+    """
+    kwargs.setdefault("verbose", False)
+    result = {}
+    result["grid"] = genetic_algorithm(
+        puzzle, fixed_cells, time_budget=time_budget, cancel=cancel, result=result, **kwargs
+    )
+    return result
 
-    print("No solution found.")
-    return population[0][0]
+SOLVERS = ("ga", "numpy", "islands", "exact")
+
+def get_solver(name):
+    """Solver function by flag name. All solvers take (puzzle, fixed_cells, ...) and return a grid."""
+    if name == "ga":
+        return genetic_algorithm
+    if name == "numpy":
+        from ga_numpy import genetic_algorithm as numpy_genetic_algorithm
+        return numpy_genetic_algorithm
+    if name == "islands":
+        from islands import island_genetic_algorithm
+        return island_genetic_algorithm
+    if name == "exact":
+        from exact import exact_algorithm
+        return exact_algorithm
+    raise ValueError(f"Unknown solver: {name}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Sudoku solver")
+    parser.add_argument("--solver", choices=SOLVERS, default="ga")
+    parser.add_argument("--input", default="assignment 2/input.txt")
+    parser.add_argument("--output", default="output.txt")
+    parser.add_argument("--check-unique", action="store_true", help="report whether the puzzle has exactly one solution")
+    parser.add_argument("--memetic", action="store_true", help="tabu local search on the elites (ga solver)")
+    parser.add_argument("--adaptive", action="store_true", help="adapt mutation, elitism and restarts online (ga solver)")
+    parser.add_argument("--adaptive-log", default=None, help="CSV file for the per-generation parameter log")
+    parser.add_argument("--log-every", type=int, default=1, help="print every N-th generation line, 0 = never (ga solver)")
+    parser.add_argument("--profile", default=None, help="JSONL file for per-generation phase timings (ga solver)")
+    parser.add_argument("--fitness-cache", type=int, default=0, help="LRU cache size for scored children, 0 = off (ga solver)")
+    parser.add_argument("--duplicates", choices=["reject", "remutate"], default=None, help="duplicate children policy (ga solver)")
+    parser.add_argument("--time-budget", type=float, default=None, help="stop after N seconds with the best grid so far (ga, numpy, islands)")
+    parser.add_argument("--check-incremental", action="store_true", help="check incremental fitness against fitness() on random 9x9 and 16x16 boards and exit")
+    args = parser.parse_args()
+
+    if args.check_incremental:
+        raise SystemExit(0 if check_incremental() else 1)
+
     # Чтение из файла закомментировано
-    puzzle = read_puzzle("assignment 2/input.txt")
+    puzzle = read_puzzle(args.input)
     
     # Чтение из консоли
     # puzzle = read_puzzle_console()
     
     fixed_cells = [[cell != 0 for cell in row] for row in puzzle]
 
-    solution = genetic_algorithm(
-        puzzle,
-        fixed_cells,
-        population_size=2500,
-        generations=15000,
-        max_stagnation=50,
-        mutation_chance=0.92,
-        elitism_count=600,
-    )
+    if args.check_unique:
+        from exact import count_solutions
+        count = count_solutions(puzzle, limit=2)
+        print({0: "No solution", 1: "Unique solution"}.get(count, "Multiple solutions"))
+
+    if args.solver == "ga":
+        adaptive = None
+        if args.adaptive:
+            adaptive = AdaptiveControl(mutation_chance=0.92, elitism_count=600, max_stagnation=50, population_size=2500)
+        profiler = GAProfiler(JsonlSink(args.profile)) if args.profile else None
+        fitness_cache = FitnessCache(args.fitness_cache or 100000) if args.fitness_cache or args.duplicates else None
+        solution = genetic_algorithm(
+            puzzle,
+            fixed_cells,
+            population_size=2500,
+            generations=15000,
+            max_stagnation=50,
+            mutation_chance=0.92,
+            elitism_count=600,
+            presolve=True,
+            memetic=args.memetic,
+            adaptive=adaptive,
+            profiler=profiler,
+            log_every=args.log_every,
+            fitness_cache=fitness_cache,
+            duplicates=args.duplicates,
+            time_budget=args.time_budget,
+        )
+        if adaptive is not None and args.adaptive_log:
+            adaptive.write_log(args.adaptive_log)
+        if profiler is not None:
+            profiler.print_summary()
+            profiler.close()
+        if fitness_cache is not None:
+            stats = fitness_cache.summary()
+            print(
+                f"Fitness cache: hit rate {stats['hit_rate'] * 100:.1f}%, {stats['rejected']} rejected, "
+                f"{stats['remutated']} re-mutated duplicates, mean diversity {stats['mean_diversity'] or 0:.3f}"
+            )
+    elif args.solver == "exact":
+        solution = get_solver(args.solver)(puzzle, fixed_cells)
+    else:
+        solution = get_solver(args.solver)(puzzle, fixed_cells, presolve=True, time_budget=args.time_budget)
     
     # Запись в файл закомментировано
-    write_solution(solution, "output.txt") 
+    write_solution(solution, args.output) 
     
     # Вывод решения в консоль
     # print("\nРешение судоку:")
@@ -1,15 +1,16 @@
 import random
 import copy
-import matplotlib.pyplot as plt
+from math import isqrt
 
 
 # Sudoku puzzle generation function based on difficulty
-def generate_sudoku(difficulty="easy"):
+def generate_sudoku(difficulty="easy", base=3):
     """
     Generate a Sudoku puzzle based on difficulty level.
     difficulty: 'easy', 'medium', 'hard', 'very_hard'
+    base: block size, 3 for 9x9, 4 for 16x16, 5 for 25x25. Larger boards blank
+    the same share of their cells as the 9x9 one.
     """
-    base = 3
     side = base * base
 
     def pattern(r, c): return (base * (r % base) + r // base + c) % side
@@ -24,6 +25,7 @@ def generate_sudoku(difficulty="easy"):
 
     squares = side * side
     empties = {"easy": 20, "medium": 35, "hard": 50, "very_hard": 60}.get(difficulty, 20)
+    empties = round(empties * squares / 81)
     for p in random.sample(range(squares), empties):
         board[p // side][p % side] = 0
 
@@ -32,33 +34,36 @@ def generate_sudoku(difficulty="easy"):
 
 # Fitness calculation
 def fitness(individual):
+    n = len(individual)
+    base = isqrt(n)
     score = 0
     # Row fitness
     for row in individual:
-        score += 9 - len(set(row))
+        score += n - len(set(row))
     # Column fitness
     for col in zip(*individual):
-        score += 9 - len(set(col))
+        score += n - len(set(col))
     # Subgrid fitness
-    for i in range(3):
-        for j in range(3):
+    for i in range(base):
+        for j in range(base):
             block = []
-            for x in range(3):
-                for y in range(3):
-                    block.append(individual[3 * i + x][3 * j + y])
-            score += 9 - len(set(block))
+            for x in range(base):
+                for y in range(base):
+                    block.append(individual[base * i + x][base * j + y])
+            score += n - len(set(block))
     return score
 
 
 # Genetic algorithm helper functions
 def create_individual(puzzle, fixed_cells):
+    size = len(puzzle)
     individual = []
-    for i in range(9):
-        nums = [n for n in range(1, 10) if n not in puzzle[i]]
+    for i in range(size):
+        nums = [n for n in range(1, size + 1) if n not in puzzle[i]]
         random.shuffle(nums)
         row = []
         idx = 0
-        for j in range(9):
+        for j in range(size):
             if fixed_cells[i][j]:
                 row.append(puzzle[i][j])
             else:
@@ -66,14 +71,14 @@ def create_individual(puzzle, fixed_cells):
                     row.append(nums[idx])
                     idx += 1
                 else:
-                    row.append(random.randint(1, 9))
+                    row.append(random.randint(1, size))
         individual.append(row)
     return individual
 
 
 def mutate(individual, fixed_cells):
-    row = random.randint(0, 8)
-    indices = [i for i in range(9) if not fixed_cells[row][i]]
+    row = random.randrange(len(individual))
+    indices = [i for i, fixed in enumerate(fixed_cells[row]) if not fixed]
     if len(indices) >= 2:
         i1, i2 = random.sample(indices, 2)
         individual[row][i1], individual[row][i2] = (
@@ -84,7 +89,7 @@ def mutate(individual, fixed_cells):
 
 def crossover(parent1, parent2):
     child = []
-    for i in range(9):
+    for i in range(len(parent1)):
         if random.random() < 0.5:
             child.append(copy.deepcopy(parent1[i]))
         else:
@@ -100,7 +105,10 @@ def genetic_algorithm(
     max_stagnation=50,
     mutation_chance=0.9,
     elitism_count=50,
+    fitness_history=None,
 ):
+    """Returns the best fitness per generation. fitness_history can be any object with
+    append() (e.g. a stream writer), so long runs can be recorded as they go."""
     population = [
         (create_individual(puzzle, fixed_cells), 0) for _ in range(population_size)
     ]
@@ -110,7 +118,8 @@ def genetic_algorithm(
     population.sort(key=lambda ind: ind[1])
     best_fitness = population[0][1]
     stagnation_counter = 0
-    fitness_history = []
+    if fitness_history is None:
+        fitness_history = []
 
     for generation in range(1, generations + 1):
         population.sort(key=lambda ind: ind[1])
@@ -170,6 +179,8 @@ def run_test_sudoku():
 
 
 def plot_fitness(sudoku_data):
+    import matplotlib.pyplot as plt
+
     difficulty_colors = {
         "easy": "blue",
         "medium": "orange",
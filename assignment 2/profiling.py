@@ -0,0 +1,117 @@
+import json
+from collections import deque
+from time import perf_counter
+
+PHASES = ("sort", "select", "crossover", "mutate", "fitness", "local_search", "restart")
+
+
+class RingBufferSink:
+    """Keeps the last `capacity` generation records in memory."""
+
+    def __init__(self, capacity=1000):
+        self.records = deque(maxlen=capacity)
+
+    def write(self, record):
+        self.records.append(record)
+
+    def close(self):
+        pass
+
+
+class JsonlSink:
+    """Appends one JSON line per generation to a file."""
+
+    def __init__(self, path):
+        self.f = open(path, "a")
+
+    def write(self, record):
+        self.f.write(json.dumps(record) + "\n")
+
+    def close(self):
+        self.f.close()
+
+
+class NullSink:
+    """Drops records; GAProfiler still keeps the run totals."""
+
+    def write(self, record):
+        pass
+
+    def close(self):
+        pass
+
+
+class GAProfiler:
+    """
+    Per-generation timings and counters for genetic_algorithm(..., profiler=GAProfiler(...)).
+    Phases: sort, select (parent sampling), crossover (building the child genome), mutate,
+    fitness (fitness cache lookup, or merging the parents' unit counts plus swap_delta after
+    a mutation), local_search (memetic mode) and restart (rebuilding the population).
+    Counters: evaluations (individuals scored, cache hits excluded), restarts, and unique
+    individuals per generation.
+    The GA has one code path; every timed phase is guarded by `profiler is not None`, so
+    without a profiler there are no clock reads, only about six such checks per child in
+    main.next_generation and a few per generation in genetic_algorithm.
+    """
+
+    def __init__(self, sink=None):
+        self.sink = sink if sink is not None else RingBufferSink()
+        self.totals = dict.fromkeys(PHASES, 0.0)
+        self.evaluations = 0
+        self.restarts = 0
+        self.generations = 0
+        self.times = None
+        self.generation_evaluations = 0
+        self.generation_start = 0.0
+
+    def start_generation(self):
+        self.times = dict.fromkeys(PHASES, 0.0)
+        self.generation_evaluations = 0
+        self.generation_start = perf_counter()
+
+    def add(self, phase, seconds):
+        self.times[phase] += seconds
+
+    def evaluated(self, count=1):
+        self.generation_evaluations += count
+
+    def restarted(self):
+        self.restarts += 1
+
+    def end_generation(self, generation, best_fitness, population):
+        seconds = perf_counter() - self.generation_start
+        for phase, value in self.times.items():
+            self.totals[phase] += value
+        self.evaluations += self.generation_evaluations
+        self.generations += 1
+        record = {"generation": generation, "best_fitness": best_fitness, "seconds": seconds}
+        record.update(self.times)
+        record["evaluations"] = self.generation_evaluations
+        record["restarts"] = self.restarts
+        record["unique"] = len({ind for ind, _, _ in population})
+        self.sink.write(record)
+
+    def summary(self):
+        """Run totals: seconds per phase, share of the measured time, and counters."""
+        measured = sum(self.totals.values()) or 1.0
+        return {
+            "generations": self.generations,
+            "evaluations": self.evaluations,
+            "restarts": self.restarts,
+            "phases": {
+                phase: {"seconds": seconds, "share": seconds / measured}
+                for phase, seconds in self.totals.items()
+            },
+        }
+
+    def print_summary(self):
+        summary = self.summary()
+        print(
+            f"{summary['generations']} generations, {summary['evaluations']} evaluations, "
+            f"{summary['restarts']} restarts"
+        )
+        for phase, row in summary["phases"].items():
+            print(f"  {phase:<13} {row['seconds']:>9.3f} s {row['share'] * 100:>6.1f}%")
+
+    def close(self):
+        self.sink.close()
@@ -0,0 +1,142 @@
+from collections import namedtuple
+from functools import lru_cache
+from math import isqrt
+
+Layout = namedtuple("Layout", "digits rows cols blocks units peers")
+
+
+@lru_cache(maxsize=None)
+def layout(n=9):
+    """
+    Digits and units of an n x n board (rows, columns, sqrt(n) x sqrt(n) blocks)
+    as lists of (row, col), and the peers of every cell.
+    """
+    base = isqrt(n)
+    if base * base != n:
+        raise ValueError(f"Board size must be a perfect square, got {n}")
+    rows = [[(r, c) for c in range(n)] for r in range(n)]
+    cols = [[(r, c) for r in range(n)] for c in range(n)]
+    blocks = [
+        [(base * br + x, base * bc + y) for x in range(base) for y in range(base)]
+        for br in range(base)
+        for bc in range(base)
+    ]
+    units = rows + cols + blocks
+    peers = {(r, c): set() for r in range(n) for c in range(n)}
+    for unit in units:
+        for cell in unit:
+            peers[cell].update(unit)
+    for cell, cell_peers in peers.items():
+        cell_peers.discard(cell)
+    return Layout(frozenset(range(1, n + 1)), rows, cols, blocks, units, peers)
+
+
+# The classic 9x9 board: all 27 units (rows, columns, 3x3 blocks)
+DIGITS, ROWS, COLS, BLOCKS, UNITS, PEERS = layout(9)
+
+
+def candidate_grid(puzzle):
+    """Candidate digits of every empty cell, empty set for filled cells."""
+    n = len(puzzle)
+    board = layout(n)
+    return [
+        [
+            set() if puzzle[r][c] else set(board.digits - {puzzle[pr][pc] for pr, pc in board.peers[(r, c)]})
+            for c in range(n)
+        ]
+        for r in range(n)
+    ]
+
+
+def place(grid, candidates, r, c, digit):
+    grid[r][c] = digit
+    candidates[r][c] = set()
+    for pr, pc in layout(len(grid)).peers[(r, c)]:
+        candidates[pr][pc].discard(digit)
+
+
+def naked_singles(grid, candidates):
+    """Fill every empty cell that has exactly one candidate left."""
+    placed = 0
+    n = len(grid)
+    for r in range(n):
+        for c in range(n):
+            if grid[r][c]:
+                continue
+            if not candidates[r][c]:
+                raise ValueError(f"Contradiction: cell ({r}, {c}) has no candidates")
+            if len(candidates[r][c]) == 1:
+                place(grid, candidates, r, c, next(iter(candidates[r][c])))
+                placed += 1
+    return placed
+
+
+def hidden_singles(grid, candidates):
+    """Fill a cell when it is the only place for some digit inside a unit."""
+    placed = 0
+    board = layout(len(grid))
+    for unit in board.units:
+        present = {grid[r][c] for r, c in unit}
+        for digit in board.digits - present:
+            places = [(r, c) for r, c in unit if digit in candidates[r][c]]
+            if not places:
+                raise ValueError(f"Contradiction: digit {digit} has no place in a unit")
+            if len(places) == 1:
+                place(grid, candidates, *places[0], digit)
+                placed += 1
+    return placed
+
+
+def locked_candidates(grid, candidates):
+    """
+    Pointing elimination: if inside a block a digit can only go in one row (or column),
+    it is removed from the rest of that row (or column).
+    """
+    removed = 0
+    board = layout(len(grid))
+    for block in board.blocks:
+        for digit in board.digits:
+            places = [(r, c) for r, c in block if digit in candidates[r][c]]
+            if len(places) < 2:
+                continue
+            for line_units, key in ((board.rows, 0), (board.cols, 1)):
+                lines = {cell[key] for cell in places}
+                if len(lines) != 1:
+                    continue
+                for r, c in line_units[lines.pop()]:
+                    if (r, c) not in block and digit in candidates[r][c]:
+                        candidates[r][c].discard(digit)
+                        removed += 1
+    return removed
+
+
+# Deduction steps from the simplest to the hardest; propagate() always retries the simplest first
+TECHNIQUES = (
+    ("naked_singles", naked_singles),
+    ("hidden_singles", hidden_singles),
+    ("locked_candidates", locked_candidates),
+)
+
+
+def propagate(puzzle, techniques=None):
+    """
+    Constraint propagation before the search starts.
+    Applies naked singles, hidden singles and locked-candidate elimination until nothing changes.
+    Returns (grid, candidates): the puzzle with every deduced cell filled in, and the candidate
+    set of each remaining empty cell. Raises ValueError if the puzzle is contradictory.
+    If a dict is passed as `techniques`, it receives how much progress each technique made
+    (cells placed, or candidates removed for locked_candidates).
+    """
+    grid = [row[:] for row in puzzle]
+    candidates = candidate_grid(grid)
+    progress = True
+    while progress:
+        progress = False
+        for name, step in TECHNIQUES:
+            changed = step(grid, candidates)
+            if changed:
+                if techniques is not None:
+                    techniques[name] = techniques.get(name, 0) + changed
+                progress = True
+                break
+    return grid, candidates
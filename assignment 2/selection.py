@@ -0,0 +1,92 @@
+import heapq
+import random
+from itertools import accumulate
+from operator import itemgetter
+
+# Parent selection strategies for genetic_algorithm(..., selection=...).
+# None keeps the original truncation scheme (full sort, uniform parents from the elites).
+# The strategies here never sort the whole population: elites are found by partial
+# selection (heapq.nsmallest, O(P log E)) and parents are drawn by the strategy.
+# Every strategy is a function (population, elites, count) -> `count` parent pairs
+# (any iterable; main.next_generation asks for more pairs if it rejects duplicates).
+
+fitness_of = itemgetter(1)
+
+
+def select_elites(population, elitism_count):
+    """The elitism_count best entries, best first, without sorting the whole population."""
+    return heapq.nsmallest(elitism_count, population, key=fitness_of)
+
+
+def truncation_parents(population, elites, count):
+    """
+    The original scheme and the default: both parents uniformly from the elites.
+    Pairs are drawn lazily, one per child, like the loop before strategies existed.
+    """
+    return (random.sample(elites, 2) for _ in range(count))
+
+
+def tournament_parents(population, elites, count, size=3):
+    """
+    Each parent is the best of `size` entries drawn from the whole population
+    (with replacement, all contestants drawn in one call).
+    """
+    contestants = random.choices(population, k=2 * count * size)
+    winners = [min(contestants[i:i + size], key=fitness_of) for i in range(0, len(contestants), size)]
+    return list(zip(winners[::2], winners[1::2]))
+
+
+def rank_parents(population, elites, count):
+    """Linear ranking over the elites: the i-th best of E elites has weight E - i."""
+    size = len(elites)
+    cum_weights = list(accumulate(range(size, 0, -1)))
+    chosen = random.choices(elites, cum_weights=cum_weights, k=2 * count)
+    return list(zip(chosen[::2], chosen[1::2]))
+
+
+def sus_parents(population, elites, count):
+    """
+    Stochastic universal sampling over the whole population: 2 * count equally spaced
+    pointers on the fitness-proportionate wheel (weight = worst fitness - fitness + 1).
+    One pass over the population, then the mating pool is shuffled into pairs.
+    """
+    worst = max(map(fitness_of, population))
+    weights = [worst - entry[1] + 1 for entry in population]
+    total = sum(weights)
+    picks = 2 * count
+    step = total / picks
+    pointer = random.random() * step
+    pool = []
+    running = 0
+    for entry, weight in zip(population, weights):
+        running += weight
+        while pointer < running and len(pool) < picks:
+            pool.append(entry)
+            pointer += step
+    while len(pool) < picks:  # float rounding at the end of the wheel
+        pool.append(population[-1])
+    random.shuffle(pool)
+    return list(zip(pool[::2], pool[1::2]))
+
+
+STRATEGIES = {
+    "truncation": truncation_parents,
+    "tournament": tournament_parents,
+    "rank": rank_parents,
+    "sus": sus_parents,
+}
+
+
+def get_strategy(selection):
+    """A strategy function from its name (or the function itself)."""
+    if callable(selection):
+        return selection
+    if selection not in STRATEGIES:
+        raise ValueError(f"Unknown selection strategy: {selection}")
+    return STRATEGIES[selection]
+
+
+def move_best_to_front(population):
+    """O(P) replacement for the sort at the top of the loop: only population[0] must be the best."""
+    best = min(range(len(population)), key=lambda i: population[i][1])
+    population[0], population[best] = population[best], population[0]
@@ -0,0 +1,159 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from batch import format_puzzle_line, iter_puzzles
+from main import fitness, genetic_algorithm, read_puzzle
+
+
+def grid_space(space):
+    """All combinations of a {kwarg: [values]} grid."""
+    keys = sorted(space)
+    for values in itertools.product(*(space[k] for k in keys)):
+        yield dict(zip(keys, values))
+
+
+def random_space(space, samples, seed=0):
+    """
+    `samples` random configs. A list value is a set of choices,
+    {"min": a, "max": b} is a uniform range (integer if both bounds are integers).
+    """
+    rng = random.Random(seed)
+    for _ in range(samples):
+        config = {}
+        for key in sorted(space):
+            value = space[key]
+            if isinstance(value, dict):
+                low, high = value["min"], value["max"]
+                if isinstance(low, int) and isinstance(high, int):
+                    config[key] = rng.randint(low, high)
+                else:
+                    config[key] = rng.uniform(low, high)
+            else:
+                config[key] = rng.choice(value)
+        yield config
+
+
+def config_hash(config):
+    return hashlib.sha1(json.dumps(config, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def cache_path(cache_dir, config, puzzle_line, seed):
+    puzzle_hash = hashlib.sha1(puzzle_line.encode()).hexdigest()[:12]
+    return os.path.join(cache_dir, f"{config_hash(config)}-{puzzle_hash}-{seed}.json")
+
+
+def run_job(config, puzzle_line, seed):
+    """One GA run in a worker process."""
+    puzzle = next(iter_puzzles([puzzle_line]))
+    fixed_cells = [[cell != 0 for cell in row] for row in puzzle]
+    random.seed(seed)
+    history = []
+    start = time.perf_counter()
+    solution = genetic_algorithm(puzzle, fixed_cells, verbose=False, history=history, **config)
+    elapsed = time.perf_counter() - start
+    score = fitness(solution)
+    return {"fitness": score, "solved": score == 0, "generations": len(history), "seconds": elapsed}
+
+
+def run_sweep(configs, puzzle_lines, seeds, cache_dir="sweep_cache", workers=None):
+    """
+    Runs every (config, puzzle, seed) job that is not cached yet on a process pool.
+    Each finished job is written to cache_dir immediately, so an interrupted or
+    extended sweep only runs what is missing.
+    Duplicate configs (random_space can draw the same one twice) and puzzles run once.
+    Returns {config_hash: (config, [result, ...])}.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    results = {}
+    todo = []
+    puzzle_lines = list(dict.fromkeys(puzzle_lines))
+    for config in configs:
+        key = config_hash(config)
+        if key in results:
+            continue
+        results[key] = (config, [])
+        for puzzle_line in puzzle_lines:
+            for seed in seeds:
+                path = cache_path(cache_dir, config, puzzle_line, seed)
+                if os.path.exists(path):
+                    with open(path, "r") as f:
+                        results[key][1].append(json.load(f))
+                else:
+                    todo.append((config, puzzle_line, seed, path))
+
+    print(f"{len(todo)} jobs to run, {sum(len(r) for _, r in results.values())} cached")
+    if not todo:
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        futures = {pool.submit(run_job, *job[:3]): job for job in todo}
+        for done, future in enumerate(as_completed(futures), start=1):
+            config, _, _, path = futures[future]
+            result = future.result()
+            with open(path + ".tmp", "w") as f:
+                json.dump(result, f)
+            os.replace(path + ".tmp", path)
+            results[config_hash(config)][1].append(result)
+            if done % 10 == 0 or done == len(todo):
+                print(f"Completed {done} / {len(todo)} jobs.")
+    return results
+
+
+def summarize(results):
+    """Rows of (config, runs, solve rate, median seconds, median generations), best first."""
+    rows = []
+    for config, runs in results.values():
+        if not runs:
+            continue
+        rows.append(
+            (
+                config,
+                len(runs),
+                sum(run["solved"] for run in runs) / len(runs),
+                statistics.median(run["seconds"] for run in runs),
+                statistics.median(run["generations"] for run in runs),
+            )
+        )
+    rows.sort(key=lambda row: (-row[2], row[3]))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hyperparameter sweep for genetic_algorithm")
+    parser.add_argument("space", help='JSON search space, e.g. \'{"mutation_chance": [0.8, 0.92]}\' or a path to a JSON file')
+    parser.add_argument("--random", type=int, default=0, help="sample N random configs instead of the full grid")
+    parser.add_argument("--puzzles", default=None, help="file with one 81-character puzzle per line (default: input.txt)")
+    parser.add_argument("--seeds", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache", default="sweep_cache")
+    args = parser.parse_args()
+
+    if os.path.exists(args.space):
+        with open(args.space, "r") as f:
+            space = json.load(f)
+    else:
+        space = json.loads(args.space)
+    configs = list(random_space(space, args.random) if args.random else grid_space(space))
+
+    if args.puzzles:
+        with open(args.puzzles, "r") as f:
+            puzzle_lines = [format_puzzle_line(p) for p in iter_puzzles(f)]
+    else:
+        puzzle_lines = [format_puzzle_line(read_puzzle(os.path.join(os.path.dirname(__file__), "input.txt")))]
+
+    results = run_sweep(configs, puzzle_lines, range(args.seeds), args.cache, args.workers)
+
+    print(f"\n{'solve rate':>10} {'median s':>9} {'median gens':>12} {'runs':>5}  config")
+    for config, runs, rate, seconds, gens in summarize(results):
+        print(f"{rate * 100:>9.1f}% {seconds:>9.2f} {gens:>12.0f} {runs:>5}  {json.dumps(config, sort_keys=True)}")
+
+
+if __name__ == "__main__":
+    main()